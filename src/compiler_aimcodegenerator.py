@@ -6,10 +6,52 @@ from compiler_block_spilt import *
 from compiler_rust_grammar import *
 from compiler_logger import logger
 from compiler_error_handler import ErrorException, ErrorCode
-from collections import defaultdict
+from collections import defaultdict, deque
 from typing import Dict, List, Optional, Set, Tuple, Union
-
-@dataclass
+from functools import partial
+import operator
+import heapq
+import sys
+
+# 操作符到指令的映射 {操作符: (寄存器指令, 立即数指令, 常量计算函数, 是否需要除零检查)}
+# 立即数指令为None表示没有对应的立即数形式；减法通过对常量取反后使用addi实现
+_OP_INFO = {
+    # 算术运算
+    '+':  ('add', 'addi', operator.add,      False),
+    '-':  ('sub', 'addi', operator.sub,      False),
+    '*':  ('mul', None,   operator.mul,      False),
+    '/':  ('div', None,   operator.floordiv, True),
+
+    # 比较运算
+    '<':  ('slt', 'slti', operator.lt,       False),
+    '<=': ('sle', None,   operator.le,       False),
+    '>':  ('sgt', None,   operator.gt,       False),
+    '>=': ('sge', None,   operator.ge,       False),
+    '==': ('seq', None,   operator.eq,       False),
+    '!=': ('sne', None,   operator.ne,       False),
+}
+
+IMM_MIN, IMM_MAX = -32768, 32767  # MIPS 16位有符号立即数范围
+
+# 寄存器名称常量(与函数无关，模块加载时生成一次)
+# 寄存器名经过驻留(intern)，作为字典键比较时可直接按指针判等
+TEMP_REGS = tuple(sys.intern(f"$t{i}") for i in range(10))  # $t0-$t9 临时寄存器
+SAVE_REGS = tuple(sys.intern(f"$s{i}") for i in range(8))   # $s0-$s7 保存寄存器
+ARG_REGS  = tuple(sys.intern(f"$a{i}") for i in range(4))   # $a0-$a3 参数寄存器
+RET_REGS  = tuple(sys.intern(f"$v{i}") for i in range(2))   # $v0-$v1 返回值寄存器
+VAR_REGS  = TEMP_REGS + SAVE_REGS                           # 可用于变量分配的寄存器
+VAR_REG_SET = frozenset(VAR_REGS)                           # 变量寄存器集合(用于成员判断)
+SP_REG    = sys.intern("$sp")                               # $sp 栈顶指针寄存器
+RA_REG    = sys.intern("$ra")                               # $ra 返回地址寄存器
+
+@dataclass(slots=True)
+class LiveInterval:
+    """变量活跃区间"""
+    var: str     # 变量名
+    start: tuple # 起始位置 (函数名, 基本块索引, 四元式索引)
+    end: tuple   # 结束位置 (函数名, 基本块索引, 四元式索引)
+
+@dataclass(slots=True)
 class StackVarInfo:
     """栈变量信息"""
     name: str                   # 变量名
@@ -18,9 +60,12 @@ class StackVarInfo:
 
 class FunctionStackFrame:
     """函数栈帧信息"""
+    __slots__ = ('name', 'old_sp', 'return_addr', 'param_num', 'local_num',
+                 'params', 'params_by_name', '_name_to_idx', '_offsets', '_in_memory')
+
     def __init__(self, name: str = "", old_sp: int = 0, return_addr: int = 0,
-                 param_num: int = 0, params: list = [tuple()],  # (参数名, 偏移量, is_in_memory) 
-                 local_num: int = 0, local_vars: list = [tuple()]
+                 param_num: int = 0, params: Optional[list] = None,
+                 local_num: int = 0, local_vars: Optional[list] = None
                 ):
         """
             初始化函数栈帧信息
@@ -30,7 +75,11 @@ class FunctionStackFrame:
             old_sp: 调用前的栈指针
             return_addr: 返回地址
             params: 参数列表 [(name, offset)]
-            local_vars: 局部变量列表 [(name, offset)]      
+            local_vars: 局部变量列表 [(name, offset, is_in_memory)]
+
+        Note:
+            局部变量按列存储(名称->下标字典 + 偏移量数组 + 内存标记数组)，
+            查询偏移量和内存标记时直接按下标访问，无需线性扫描
         """
         self.name = name
         self.old_sp = old_sp
@@ -38,41 +87,76 @@ class FunctionStackFrame:
 
         self.param_num = param_num
         self.local_num = local_num
-        self.params = params          # (参数名, 偏移量, is_in_memory)
-        self.local_vars = local_vars  # (变量名, 偏移量, is_in_memory)
+        self.params = params or []                                 # (参数名, 偏移量)
+        self.params_by_name: Dict[str, int] = {}                   # 参数名 -> 偏移量
+        for param_name, param_offset in self.params:
+            self.params_by_name.setdefault(param_name, param_offset)
+
+        self._name_to_idx: Dict[str, int] = {}  # 变量名 -> 下标
+        self._offsets: list[int] = []           # 下标 -> 偏移量
+        self._in_memory = bytearray()           # 下标 -> 是否在内存中
+        for var_name, var_offset, is_in_memory in (local_vars or []):
+            if var_name in self._name_to_idx:
+                continue
+            self._name_to_idx[var_name] = len(self._offsets)
+            self._offsets.append(var_offset)
+            self._in_memory.append(1 if is_in_memory else 0)
+
+    @property
+    def local_vars(self) -> list[tuple[str, int, bool]]:
+        """局部变量列表 [(变量名, 偏移量, is_in_memory)]"""
+        return [
+            (var_name, self._offsets[idx], bool(self._in_memory[idx]))
+            for var_name, idx in self._name_to_idx.items()
+        ]
     
-    def size(self) -> int:
-        """计算栈帧总大小(Bytes)"""
+    @staticmethod
+    def frame_size(param_num: int, local_num: int) -> int:
+        """根据参数和局部变量个数计算栈帧总大小(Bytes)"""
         return (
             4 +                         # 返回地址
-            4 * (self.param_num + 1) +  # 参数列表大小
-            4 * (self.local_num + 1) +  # 局部变量大小
+            4 * (param_num + 1) +       # 参数列表大小
+            4 * (local_num + 1) +       # 局部变量大小
             8                           # 保留8字节
         )
+
+    def size(self) -> int:
+        """计算栈帧总大小(Bytes)"""
+        return self.frame_size(self.param_num, self.local_num)
     
     def get_var_offset(self, varname: str) -> Optional[int]:
-        """获取变量在栈帧中的偏移量 用于访问内存 Memory """
-        return next((offset for name, offset, _ in self.local_vars if name == varname), None)
+        """获取变量(局部变量或参数)在栈帧中的偏移量 用于访问内存 Memory """
+        idx = self._name_to_idx.get(varname)
+        return self._offsets[idx] if idx is not None else self.params_by_name.get(varname)
     
     def set_var_memflag(self, varname: str, is_in_memory: bool):
         """设置变量是否在内存中"""
-        for i, (name, offset, _) in enumerate(self.local_vars):
-            if name == varname:
-                self.local_vars[i] = (name, offset, is_in_memory)
-                return
+        idx = self._name_to_idx.get(varname)
+        if idx is not None:
+            self._in_memory[idx] = 1 if is_in_memory else 0
     
-    def if_var_in_memory(self, varname: str):
+    def if_var_in_memory(self, varname: str) -> bool:
         """检查变量是否在内存中"""
-        return next((is_in_memory for name, _, is_in_memory in self.local_vars if name == varname), False)
+        idx = self._name_to_idx.get(varname)
+        return idx is not None and bool(self._in_memory[idx])
     
 class FunctionStack:
     """函数栈，存放所有函数的栈帧信息"""
     def __init__(self, symbolTable: SymbolTable):
         self.symbolTable = symbolTable              # 符号表，存储函数和变量信息
         self.frames: list[FunctionStackFrame] = []  # 栈帧列表，存放所有函数的栈帧信息
+        self._by_name: Dict[str, FunctionStackFrame] = {}  # 函数名 -> 栈帧
     
-    def build_frame(self,func_name: str) -> FunctionStackFrame:
-        """构建某个函数的栈帧信息"""
+    def build_frame(self, func_name: str, extra_vars: Optional[list[str]] = None) -> FunctionStackFrame:
+        """
+            构建某个函数的栈帧信息
+
+        Args:
+            func_name: 函数名
+            extra_vars: 函数中使用的其他变量(临时变量、内层作用域的局部变量)，
+                        不在函数作用域符号中的变量也分配栈帧位置，供寄存器溢出和函数调用时保存
+        """
+        func_name = sys.intern(func_name)
         scope = self.symbolTable.find_scope(func_name)          # 获取函数所在的作用域
         old_sp =  self.frames[-1].size() if self.frames else 0  # 获取old_sp，如果没有栈帧则为0
         return_addr = 0
@@ -92,50 +176,278 @@ class FunctionStack:
             elif isinstance(symbol, VariableSymbol):
                 local_num += 1
                 local_vars.append((symbol.name, -4 * (param_num + 1) - 4 * (local_num + 1) + offset, False))
+
+        # 为其余变量追加局部变量位置
+        known = set(scope.symbols)
+        for var_name in extra_vars or ():
+            if var_name not in known:
+                known.add(var_name)
+                local_num += 1
+                local_vars.append((var_name, -4 * (param_num + 1) - 4 * (local_num + 1) + offset, False))
+
+        # 函数入口处$sp下移整个栈帧，偏移量改为相对于下移后的$sp(返回地址位于 size-4)
+        size = FunctionStackFrame.frame_size(param_num, local_num)
+        params = [(name, var_offset + size) for name, var_offset in params]
+        local_vars = [(name, var_offset + size, in_memory) for name, var_offset, in_memory in local_vars]
         
         # 创建栈帧对象
         frame = FunctionStackFrame(func_name, old_sp, return_addr, param_num, params, local_num, local_vars)
         self.frames.append(frame)
+        self._by_name.setdefault(func_name, frame)
 
         return frame
         
     def get_frame(self, name: str) -> Optional[FunctionStackFrame]:
         """获取某个函数的栈帧信息"""
-        for frame in self.frames:
-            if frame.name == name:
-                return frame
-            
-        return None
+        return self._by_name.get(name)
     
 class MemController():
-    """内存分配控制器"""
+    """
+        内存分配控制器(基于活跃区间的线性扫描寄存器分配)
+
+    Note:
+        活跃区间按四元式排列顺序计算，并用活跃变量分析扩展到变量在其入口/出口活跃的整个基本块，
+        因此寄存器变量在整个区间内占有同一个寄存器，任何基本块边界上的位置都一致；
+        无法整段占有寄存器的变量(被让渡过)改为"内存变量"：栈帧是其唯一的位置，
+        每次定值后立即写回，基本块开始和函数调用时丢弃其寄存器副本，使用时重新加载
+    """
+    __slots__ = ('varregs', 'pararegs', 'retregs', 'spreg', 'rareg',
+                 'rvalues', 'free_regs', 'var_use_pos', 'intervals', '_expire_heap', '_spill_heap',
+                 '_pinned_pos', '_pinned', 'current_home', 'memory_vars', 'spilled_vars',
+                 '_coalesce_parent', '_coalesce_members', '_coalesce_span', 'function_stack',
+                 'emit_comments')
+
     def __init__(self, function_stack: FunctionStack = None):
         """初始化内存控制器"""
-        TEMP_REGS = [f"$t{i}" for i in range(10)]  # $t0-$t9 临时寄存器
-        SAVE_REGS = [f"$s{i}" for i in range(8)]   # $s0-$s7 保存寄存器
-        ARG_REGS  = [f"$a{i}" for i in range(4)]   # $a0-$a3 参数寄存器
-        RET_REG   = [f"$v{i}" for i in range(2)]   # $v0-$v1 返回值寄存器
-        SP_REG    = "$sp"                          # $sp 栈顶指针寄存器
-        RA_REG    = "$ra"                          # $ra 返回地址寄存器
-
         # 寄存器池     
-        self.varregs = TEMP_REGS + SAVE_REGS # 可用于变量分配的寄存器
-        self.pararegs = ARG_REGS             # 参数传递专用寄存器
-        self.retregs = RET_REG               # 返回值寄存器
-        self.spreg = SP_REG                  # 栈顶指针寄存器
-        self.rareg = RA_REG                  # 返回地址寄存器
+        self.varregs = VAR_REGS  # 可用于变量分配的寄存器
+        self.pararegs = ARG_REGS # 参数传递专用寄存器
+        self.retregs = RET_REGS  # 返回值寄存器
+        self.spreg = SP_REG      # 栈顶指针寄存器
+        self.rareg = RA_REG      # 返回地址寄存器
 
         # 寄存器分配状态
-        self.rvalues: Dict[tuple[str,str], str] = {}  # 变量寄存器映射 {(函数名,变量名): 寄存器}
-        self.usedregs: Set[str] = set()               # 当前已占用的寄存器集合
-        self.valregs: list = self.varregs.copy()      # 可用寄存器池
+        self.rvalues: Dict[str, Dict[str, str]] = defaultdict(dict)  # 变量寄存器映射 {函数名: {变量名: 寄存器}}
+        self.free_regs: deque[str] = deque(self.varregs)             # 空闲寄存器队列(只包含变量寄存器)
 
         # 变量使用位置追踪
-        self.var_use_pos: Dict[str, list] = {}  # 变量名 -> [使用位置列表]
-                                                # 使用位置格式: (函数名, 基本块索引, 四元式索引)
+        self.var_use_pos: Dict[str, Dict[str, list]] = {}  # 函数名 -> {变量名: [使用位置列表](按遍历顺序有序)}
+                                                           # 使用位置格式: (函数名, 基本块索引, 四元式索引)
+        # 活跃区间
+        self.intervals: Dict[tuple[str,str], LiveInterval] = {}  # (函数名,变量名) -> 活跃区间
+        # 当前占用寄存器的区间，用两个惰性删除的堆维护(条目为结束位置的(基本块索引, 四元式索引)和变量名)
+        self._expire_heap: list[tuple[int, int, str]] = []       # 小顶堆: 结束最早的区间在堆顶，用于释放
+        self._spill_heap: list[tuple[int, int, str]] = []        # 大顶堆(索引取负): 结束最晚的区间在堆顶，用于让渡
+        self._pinned_pos: Optional[tuple] = None                 # 当前四元式位置
+        self._pinned: Set[tuple[str,str]] = set()                # 当前四元式已使用的变量(不能被让渡)
+        self.current_home: Dict[tuple[str,str], Union[str, int]] = {}  # 变量当前所在位置: 寄存器名 或 栈帧偏移量
+        self.memory_vars: Set[tuple[str,str]] = set()   # 当前函数中以栈帧为位置的内存变量
+        self.spilled_vars: Set[tuple[str,str]] = set()  # 本次生成中被让渡的寄存器变量(函数需按内存变量重新生成)
+
+        # 赋值合并(并查集): 活跃区间互不冲突的赋值两端共享同一个寄存器
+        self._coalesce_parent: Dict[tuple[str,str], tuple[str,str]] = {}        # 变量 -> 父节点
+        self._coalesce_members: Dict[tuple[str,str], list[tuple[str,str]]] = {}  # 根 -> 组内变量
+        self._coalesce_span: Dict[tuple[str,str], tuple[tuple, tuple]] = {}     # 根 -> 组的合并区间
+
         # 关联的函数栈管理器
         self.function_stack: Optional[FunctionStack] = function_stack
-        
+
+        # 是否在生成的指令后附加注释
+        self.emit_comments: bool = True
+
+    def compute_intervals(self, func_name: str, blocks: list, in_sets: list[frozenset[str]], out_sets: list[frozenset[str]]):
+        """
+            计算函数内每个变量的活跃区间
+
+        Args:
+            func_name: 函数名
+            blocks: 函数的基本块列表
+            in_sets/out_sets: 各基本块入口/出口的活跃变量集合
+
+        Note:
+            区间由变量的首次/最后使用位置确定，并用活跃变量分析结果扩展：
+            变量在块入口活跃则区间至少从块首开始，在块出口活跃则区间至少延伸到块尾，
+            从而覆盖循环回边上仍需保持的值
+        """
+        bounds: Dict[str, list] = {}  # 变量名 -> [起始位置, 结束位置]
+
+        def extend(var: str, pos: tuple):
+            if var not in bounds:
+                bounds[var] = [pos, pos]
+            elif pos < bounds[var][0]:
+                bounds[var][0] = pos
+            elif pos > bounds[var][1]:
+                bounds[var][1] = pos
+
+        for var, use_list in self.var_use_pos.get(func_name, {}).items():
+            extend(var, use_list[0])
+            extend(var, use_list[-1])
+
+        for block_idx, block in enumerate(blocks):
+            for var in in_sets[block_idx]:
+                extend(var, (func_name, block_idx, 0))
+            for var in out_sets[block_idx]:
+                extend(var, (func_name, block_idx, len(block) - 1))
+
+        for var, (start, end) in bounds.items():
+            self.intervals[(func_name, var)] = LiveInterval(var, start, end)
+
+    def _find(self, key: tuple[str, str]) -> tuple[str, str]:
+        """查找变量所在合并组的根(路径压缩)"""
+        parent = self._coalesce_parent.setdefault(key, key)
+        if parent != key:
+            parent = self._coalesce_parent[key] = self._find(parent)
+        return parent
+
+    def coalesce(self, func_name: str, pairs: list[tuple[str, str]]):
+        """
+            合并赋值四元式两端的变量
+
+        Args:
+            func_name: 函数名
+            pairs: 赋值对列表 [(源变量, 目标变量)]
+
+        Note:
+            只有两组的活跃区间至多在端点相接(源在赋值处结束，目标在赋值处开始)时才合并，
+            合并后分配寄存器时目标变量直接沿用源变量的寄存器，赋值指令随之省略
+        """
+        for src, dst in pairs:
+            key_src, key_dst = (func_name, src), (func_name, dst)
+            if key_src not in self.intervals or key_dst not in self.intervals:
+                continue
+            root_src, root_dst = self._find(key_src), self._find(key_dst)
+            if root_src == root_dst:
+                continue
+
+            interval_src, interval_dst = self.intervals[key_src], self.intervals[key_dst]
+            span_src = self._coalesce_span.get(root_src, (interval_src.start, interval_src.end))
+            span_dst = self._coalesce_span.get(root_dst, (interval_dst.start, interval_dst.end))
+            if not (span_src[1] <= span_dst[0] or span_dst[1] <= span_src[0]):
+                continue  # 区间冲突，不能合并
+
+            self._coalesce_parent[root_dst] = root_src
+            members = self._coalesce_members.setdefault(root_src, [root_src])
+            members.extend(self._coalesce_members.pop(root_dst, [root_dst]))
+            self._coalesce_span.pop(root_dst, None)
+            self._coalesce_span[root_src] = (min(span_src[0], span_dst[0]), max(span_src[1], span_dst[1]))
+
+    def _take_coalesced_reg(self, key: tuple[str, str], cur_pos: tuple[str, int, int]) -> Optional[str]:
+        """若同组变量占有寄存器且其区间已在当前位置结束，则释放该寄存器供当前变量沿用"""
+        root = self._find(key)
+        for other in self._coalesce_members.get(root, ()):
+            reg = self.rvalues[other[0]].get(other[1])
+            if other == key or reg is None or self.intervals[other].end > cur_pos:
+                continue
+            del self.rvalues[other[0]][other[1]]  # 堆中的条目随之失效
+            if other not in self.memory_vars:
+                self.current_home.pop(other, None)
+            return reg  # 寄存器直接转交，不经过空闲队列
+        return None
+
+    def enter_function(self, func_name: str, memory_vars: Set[str] = frozenset()):
+        """
+            进入新函数时释放上一个函数占用的寄存器
+
+        Args:
+            func_name: 函数名
+            memory_vars: 当前函数中以栈帧为位置的变量名(上一次生成时被让渡过寄存器的变量)
+
+        Note:
+            函数按顺序逐个生成，上一个函数的变量在当前函数中不再使用(调用前已保存)
+        """
+        for alloc_func in list(self.rvalues):
+            for reg in self.rvalues.pop(alloc_func).values():
+                self.release_reg(reg)
+        self._expire_heap = []
+        self._spill_heap = []
+        self._pinned_pos = None
+        self._pinned = set()
+        self.spilled_vars = set()
+        self.memory_vars = {(func_name, var) for var in memory_vars}
+        self.current_home = {}
+        frame = self.function_stack.get_frame(func_name) if self.function_stack else None
+        for key in self.memory_vars:
+            offset = frame.get_var_offset(key[1]) if frame else None
+            if offset is None:
+                raise ErrorException(
+                    message=f"变量 {key[1]} 在 {func_name} 函数的栈帧中没有位置，无法溢出",
+                    error_code=ErrorCode.INTERNAL_COMPILER_ERR
+                )
+            self.current_home[key] = offset
+
+    def drop_memory_vars(self, func_name: str):
+        """丢弃内存变量的寄存器副本(值已写回栈帧)，用于基本块开始处和函数调用前"""
+        func_regs = self.rvalues[func_name]
+        for var in [v for v in func_regs if (func_name, v) in self.memory_vars]:
+            self.release_reg(func_regs.pop(var))
+
+    def write_back(self, func_name: str, var: str, code: list):
+        """内存变量被定值后立即写回栈帧"""
+        key = (func_name, var)
+        reg = self.rvalues[func_name].get(var)
+        if key in self.memory_vars and reg is not None:
+            offset = self.current_home[key]
+            self.emit(code, f"sw {reg}, {offset}({self.spreg})", f"写回内存变量 {var}")
+
+    def assign_reg(self, key: tuple[str, str], reg: str):
+        """将寄存器绑定到变量，并把变量的活跃区间压入两个堆"""
+        self.rvalues[key[0]][key[1]] = reg
+        if key not in self.memory_vars:
+            self.current_home[key] = reg
+        interval = self.intervals.get(key)
+        if interval is not None:
+            _, end_block, end_quad = interval.end
+            heapq.heappush(self._expire_heap, (end_block, end_quad, key[1]))
+            heapq.heappush(self._spill_heap, (-end_block, -end_quad, key[1]))
+
+    def release_reg(self, reg: str):
+        """释放寄存器，变量寄存器回到空闲队列(参数寄存器等不在分配池中，忽略)"""
+        if reg in VAR_REG_SET:
+            self.free_regs.append(reg)
+
+    def _is_current(self, func_name: str, var: str, end_block: int, end_quad: int) -> bool:
+        """判断堆中的条目是否仍然有效(变量仍占有寄存器且区间结束位置未变)"""
+        interval = self.intervals.get((func_name, var))
+        return (var in self.rvalues[func_name] and interval is not None and
+                interval.end[1] == end_block and interval.end[2] == end_quad)
+
+    def expire_old_intervals(self, cur_pos: tuple[str, int, int]):
+        """释放结束位置在当前位置之前的区间所占用的寄存器"""
+        func_name, cur_block, cur_quad = cur_pos
+        func_regs = self.rvalues[func_name]
+        heap = self._expire_heap
+        while heap and (heap[0][0], heap[0][1]) < (cur_block, cur_quad):
+            end_block, end_quad, var = heapq.heappop(heap)
+            if not self._is_current(func_name, var, end_block, end_quad):
+                continue  # 已失效的条目直接丢弃
+            self.release_reg(func_regs.pop(var))
+            if (func_name, var) not in self.memory_vars:
+                self.current_home.pop((func_name, var), None)
+
+    def _pop_spill_victim(self, func_name: str) -> Optional[str]:
+        """从大顶堆中弹出结束位置最远且不属于当前四元式的变量"""
+        heap = self._spill_heap
+        skipped = []
+        victim = None
+        while heap:
+            entry = heapq.heappop(heap)
+            neg_block, neg_quad, var = entry
+            if not self._is_current(func_name, var, -neg_block, -neg_quad):
+                continue  # 已失效的条目直接丢弃
+            if (func_name, var) in self._pinned:
+                skipped.append(entry)
+                continue
+            victim = var
+            break
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        return victim
+
+    def is_live_after(self, key: tuple[str, str], cur_pos: tuple[str, int, int]) -> bool:
+        """判断变量在当前四元式位置之后是否仍然活跃(活跃区间的结束位置在当前位置之后)"""
+        interval = self.intervals.get(key)
+        return interval is not None and interval.end > cur_pos
+
     def get_live_vars_after(self, cur_pos: tuple[str, int, int]) -> list[str]:
         """
             返回在当前四元式位置之后还会被用到的变量名列表(在当前函数中)
@@ -144,165 +456,276 @@ class MemController():
             cur_pos: 当前四元式位置 (函数名, 基本块索引, 四元式索引)
         """
         func_name = cur_pos[0]
-        live_vars = []
-
-        # 如果变量在当前位置之后还会被使用且位于寄存器中，则认为它是活跃的
-        # 遍历所有变量的使用位置
-        for var, use_list in self.var_use_pos.items():
-            if (var != '$ret_reg' and                                          # 排除返回寄存器
-                (func_name, var) in self.rvalues and                           # 先检查变量是否在寄存器中
-                any(pos[0] == func_name and pos > cur_pos for pos in use_list) # 再检查变量位于的使用位置是否在当前位置之后
-            ):
-                live_vars.append(var)
 
-        return live_vars
+        # 如果变量位于寄存器中且其活跃区间在当前位置之后仍未结束，则认为它是活跃的
+        # 只需遍历当前函数已分配寄存器的变量(数量不超过寄存器个数)
+        return [
+            var for var in self.rvalues[func_name]
+            if (var != '$ret_reg' and                                # 排除返回寄存器
+                (func_name, var) not in self.memory_vars and         # 内存变量的值已在栈帧中
+                self.is_live_after((func_name, var), cur_pos))       # 区间结束位置在当前位置之后
+        ]
 
-    def alloc_reg(self, varname: str, cur_pos: tuple, code: list) -> str:
+    def alloc_reg(self, varname: str, cur_pos: tuple, code: list, load: bool = True) -> str:
         """
             为变量分配寄存器
         
         Args:
             varname: 需要分配的变量名
             cur_pos: 当前位置 (函数名, 基本块索引, 四元式索引)
-            code: 生成的指令列表 (用于插入spill代码)
+            code: 生成的指令列表 (用于插入spill/reload代码)
+            load: 变量被溢出到栈帧时是否需要加载旧值(作为结果被定值时无需加载)
         
         Returns:
             str: 分配到的寄存器名
 
-        算法步骤:
+        算法步骤(线性扫描):
             1. 检查变量是否已经在寄存器中，如果是，直接返回对应寄存器名
-            2. 检查是否有空闲寄存器，如果有，直接分配一个空闲寄存器
-            3. 如果没有空闲寄存器，选择“下次使用最远”的变量进行寄存器让渡
-            --| 3.1. 如果被让渡的变量在当前函数之后再也不会用到，则不需要保存到内存
-            --| 3.2. 如果被让渡的变量在当前函数之后还会用到，则需要将其保存到内存
+            2. 释放区间已结束的变量所占用的寄存器
+            3. 检查是否有空闲寄存器，如果有，直接分配一个空闲寄存器
+            4. 如果没有空闲寄存器，优先丢弃内存变量的寄存器副本(已写回，无需保存)
+            5. 否则让渡结束位置最远的区间(大顶堆堆顶)的寄存器，被让渡的变量记入spilled_vars，
+               由调用方把它改为内存变量后重新生成整个函数(寄存器变量在基本块边界上的位置必须一致)
+            6. 如果变量当前位于栈帧中，分配寄存器后加载一次，本基本块内之后直接使用寄存器
         """
-        # 1. 如果变量已在寄存器中，直接返回
         func_name = cur_pos[0]
         key = (func_name, varname)
+        func_regs = self.rvalues[func_name]
+
+        # 当前四元式中已使用的变量不能被让渡
+        if cur_pos != self._pinned_pos:
+            self._pinned_pos = cur_pos
+            self._pinned = set()
+        self._pinned.add(key)
 
         # ---- 情况1：变量已有寄存器 ----
-        if key in self.rvalues:
-            return self.rvalues[key]
+        reg = func_regs.get(varname)
+        if reg is not None:
+            return reg
+
+        # ---- 情况1.5：沿用合并组中已结束变量的寄存器 ----
+        reg = self._take_coalesced_reg(key, cur_pos)
+        if reg is not None:
+            return self._bind_reg(key, reg, cur_pos, code, load)
+
+        # ---- 释放已结束的区间 ----
+        self.expire_old_intervals(cur_pos)
 
         # ---- 情况2：有空闲寄存器 ----
-        free_regs = [r for r in self.valregs if r not in self.usedregs]
-        if free_regs:
-            reg = free_regs[0]
-            self.rvalues[key] = reg
-            self.usedregs.add(reg)
-
-        # ---- 情况3：需要寄存器让渡 ----
-        else:
-            # 寻找"下次使用最远"的牺牲变量
-            farthest_next = None     # (函数名, 块索引, 四元式索引)
-            victim_var = None        # 被牺牲的变量名
-            victim_func = None       # 被牺牲的函数名
-
-            # 遍历所有已分配寄存器的变量，找到下次使用最远的变量
-            for (alloc_func, alloc_var), reg in self.rvalues.items():
-                use_list = self.var_use_pos.get(alloc_var, [])
-                next_use = next((pos for pos in use_list if pos >= cur_pos), None)
-
-                if next_use is None:
-                    victim_var, victim_func = alloc_var, alloc_func
-                    break  # 找到最佳牺牲者，立即终止，不再需要比较
-                elif not farthest_next or next_use > farthest_next:
-                    victim_var, victim_func, farthest_next = alloc_var, alloc_func, next_use
-            
-            # 获取牺牲变量的寄存器
-            reg = self.rvalues[(victim_func, victim_var)]
-
-            # 如果牺牲的变量在当前函数之后还会被用到，需要保存到内存
-            # 如果牺牲的寄存器是其他函数的变量，因为在call时已保存，所以无需进行保存
-            # 如果牺牲的变量在当前函数之后再也不会用，所以也无需进行保存
-            if victim_func == func_name and victim_var in self.get_live_vars_after(cur_pos):
-                if self.function_stack:
-                    frame = self.function_stack.get_frame(victim_func)           # 获取当前函数的栈帧
-                    offset = frame.get_var_offset(victim_var) if frame else None # 获取变量在栈帧中的偏移量
-                    
-                    # 如果偏移量不为None，说明变量在栈帧中
-                    if offset is not None:
-                        frame.set_var_memflag(victim_var, True)  # 标记为在内存中
-                        code.append(f"    sw {reg}, {offset}({self.spreg}) # <寄存器溢出> 将 {victim_var} 的值从寄存器 {reg} 保存到 {victim_func} 函数的栈帧偏移位置 {offset}")
-
-            # 释放被牺牲的寄存器，并分配给新变量
-            del self.rvalues[(victim_func, victim_var)]
-            self.usedregs.discard(reg)
-            self.rvalues[key] = reg
-            self.usedregs.add(reg)    
-
-        return self.rvalues[key]
+        if self.free_regs:
+            return self._bind_reg(key, self.free_regs.popleft(), cur_pos, code, load)
+
+        # ---- 情况3：丢弃内存变量的寄存器副本 ----
+        copies = [var for var in func_regs if (func_name, var) in self.memory_vars and (func_name, var) not in self._pinned]
+        if copies:
+            victim_var = max(copies, key=lambda var: self.intervals[(func_name, var)].end)
+            return self._bind_reg(key, func_regs.pop(victim_var), cur_pos, code, load)
+
+        # ---- 情况4：需要寄存器让渡 ----
+        # 从结束位置最远的区间开始寻找牺牲者(跳过当前四元式正在使用的变量)
+        victim_var = self._pop_spill_victim(func_name)
+        if victim_var is None:
+            raise ErrorException(
+                message=f"无可用寄存器分配给变量 {varname}",
+                error_code=ErrorCode.INTERNAL_COMPILER_ERR
+            )
+        # 堆中只剩区间未结束的变量，被让渡后本次生成的代码作废，函数以它为内存变量重新生成
+        self.spilled_vars.add((func_name, victim_var))
+        self.current_home.pop((func_name, victim_var), None)
+        return self._bind_reg(key, func_regs.pop(victim_var), cur_pos, code, load)
+
+    def emit(self, code: list, instr: str, comment: Optional[str] = None):
+        """追加一条指令，仅在开启注释(emit_comments)时在其后附加说明注释"""
+        code.append(f"    {instr}  # {comment}" if comment and self.emit_comments else f"    {instr}")
+
+    def _bind_reg(self, key: tuple[str, str], reg: str, cur_pos: tuple, code: list, load: bool) -> str:
+        """将寄存器分配给变量，若变量当前位于栈帧中则先加载到寄存器"""
+        home = self.current_home.get(key)
+        if load and isinstance(home, int):
+            self.emit(code, f"lw {reg}, {home}({self.spreg})", f"加载 {key[1]}")
+        self.assign_reg(key, reg)
+        return reg
     
 class AimCodeGenerator:
     """"目标代码生成器"""
-    def __init__(self, quads: list, symbolTable: SymbolTable):
+    __slots__ = ('quads', 'symbolTable', 'labels', 'code', 'param_indices', 'emit_comments',
+                 'block_controller', 'function_stack', 'mem_controller', 'frame_vars')
+
+    def __init__(self, quads: list, symbolTable: SymbolTable, emit_comments: bool = True):
         """
             初始化目标代码生成器
 
         Args:
             quads (list): 四元式序列
             symbolTable (SymbolTable): 符号表，存储变量和函数的信息
+            emit_comments (bool): 是否在指令后附加说明注释(关闭时只输出指令本身)
         """
         # 初始化四元式和符号表
         self.quads = quads
         self.symbolTable = symbolTable
+        self.emit_comments = emit_comments
+
+        # 驻留四元式中的变量名，之后各处以变量名为键的字典查找只需比较指针
+        intern = sys.intern
+        for _, quad in quads:
+            if type(quad.arg1) is str:
+                quad.arg1 = intern(quad.arg1)
+            if type(quad.arg2) is str:
+                quad.arg2 = intern(quad.arg2)
+            if type(quad.result) is str:
+                quad.result = intern(quad.result)
+
+        # 预先解析param四元式的参数序号(param_1 -> 1)，格式错误时在此处直接报错
+        self.param_indices: Dict[str, int] = {}  # param四元式的result -> 参数序号
+        for _, quad in quads:
+            if quad.op == 'param' and quad.result not in self.param_indices:
+                self.param_indices[quad.result] = self._parse_param_index(quad.result)
 
         # 初始化生成的目标代码相关属性
-        self.labels: Dict[str, list[str]] = {}  # 存储函数标签
-        self.code: List[str] = []               # 生成的目标代码
+        self.labels: Dict[str, list[str]] = {}      # 存储函数标签
+        self.code: List[str] = []                   # 生成的目标代码
+        self.frame_vars: Dict[str, list[str]] = {}  # 函数名 -> 需要栈帧位置的变量(按首次使用顺序)
 
         # 初始化各个控制器
         self.block_controller = BlockController(quads, symbolTable)
         self.function_stack = FunctionStack(symbolTable)
         self.mem_controller = MemController(self.function_stack)
+        self.mem_controller.emit_comments = emit_comments
 
         self.build_var_use_pos()
         
-    def build_var_use_pos(self):
-        """统计每个变量的所有使用位置，赋值给 self.mem_controller.var_use_pos"""
-        var_use_pos = defaultdict(list)
+    @staticmethod
+    def _parse_param_index(result: str) -> int:
+        """解析参数序号(param_1/param1 -> 1)"""
+        digits = result.removeprefix('param').lstrip('_') if isinstance(result, str) else ''
+        if not digits.isdigit() or int(digits) < 1:
+            raise ErrorException(
+                message=f"无效的参数寄存器格式: {result} (当前仅支持param1~param4)", 
+                error_code=ErrorCode.INVALID_PARAM_FORMAT
+            )
+        return int(digits)
 
-        for func_name, blocks in self.block_controller.func_blocks.items():
+    def build_var_use_pos(self):
+        """统计每个变量的所有使用位置，并计算各函数内变量的活跃区间"""
+        block_controller = self.block_controller
+        mc = self.mem_controller
+        mc.var_use_pos = {}
+
+        # 使用位置在遍历时即按函数分组，每个函数只处理自己的变量
+        for func_name, blocks in block_controller.func_blocks.items():
+            use_pos = mc.var_use_pos[func_name] = defaultdict(list)  # 变量名 -> [使用位置列表]
+            coalesce_pairs = []  # [(源变量, 目标变量)]，来自变量间的赋值四元式
             for block_idx, block in enumerate(blocks):
                 for quad_idx, (idx, quad) in enumerate(block):
-                    # 获取四元式所有操作数(过滤None和非字符串)
-                    operands = filter(None, [
-                        getattr(quad, 'arg1', None),
-                        getattr(quad, 'arg2', None), 
-                        getattr(quad, 'result', None)
-                    ])
-                    for var in (v for v in operands if isinstance(v, str)):
-                        var_use_pos[var].append((func_name, block_idx, quad_idx))
+                    # 直接读取操作数字段，只统计非空字符串(变量名)
+                    arg1, arg2, res = quad.arg1, quad.arg2, quad.result
+                    pos = (func_name, block_idx, quad_idx)
+                    if arg1.__class__ is str and arg1:
+                        use_pos[arg1].append(pos)
+                        if quad.op == '=' and arg1 != '$ret_reg':
+                            coalesce_pairs.append((arg1, res))
+                    if arg2.__class__ is str and arg2:
+                        use_pos[arg2].append(pos)
+                    if res.__class__ is str and res:
+                        use_pos[res].append(pos)
+
+            # param四元式的result(param_1等)只是参数寄存器的标记，不需要栈帧位置
+            func_vars = block_controller.func_vars[func_name]
+            self.frame_vars[func_name] = [
+                var for var in use_pos
+                if var in func_vars and var not in self.param_indices
+            ]
+
+            # 基本块控制器已对函数内所有变量(包括临时变量)做了活跃变量分析，据此计算活跃区间
+            in_sets, out_sets = block_controller.live_vars[func_name]
+            mc.compute_intervals(func_name, blocks, in_sets, out_sets)
+            mc.coalesce(func_name, coalesce_pairs)
         
-        # 更新内存控制器的变量使用位置
-        self.mem_controller.var_use_pos = var_use_pos
-        
-    def quad_to_code(self, quad_with_index: tuple[int, Quadruple], cur_pos: Tuple[str, int, int]) -> List[str]:
+    def quad_to_code(self, quad_with_index: tuple[int, Quadruple], cur_pos: Tuple[str, int, int],
+                     frame: Optional[FunctionStackFrame] = None) -> List[str]:
         """
             将四元式转换为目标代码
 
         Args:
             quad: 四元式对象
             cur_pos: 当前四元式位置 (函数名, 基本块索引, 四元式索引)
+            frame: 当前函数的栈帧(由调用方按函数缓存，未提供时按函数名查找)
         """
         code = []                                        # 生成的目标代码列表
         index, quad = quad_with_index                    # 解包四元式和索引
         op, arg1, arg2, result = quad                    # 四元式的操作符和操作数
 
+        # 操作数类型标记只计算一次(type(x) is int 比 isinstance 少一次继承链检查)
+        arg1_is_int, arg1_is_var = type(arg1) is int, type(arg1) is str
+        arg2_is_int, arg2_is_var = type(arg2) is int, type(arg2) is str
+
         func_name = cur_pos[0]                           # 获取当前函数名
-        frame = self.function_stack.get_frame(func_name) # 获取当前函数的栈帧
+        if frame is None:
+            frame = self.function_stack.get_frame(func_name) # 获取当前函数的栈帧
+
+        # 缓存热路径上频繁访问的属性和方法，避免重复的属性查找
+        append = code.append                     # 追加原样的行(标签、空行等)
+        mc = self.mem_controller
+        emit = partial(mc.emit, code)            # 追加指令(注释由emit_comments控制)
+        alloc = mc.alloc_reg
+        sp, ra = mc.spreg, mc.rareg
+        comments = self.emit_comments
+
+        # 死代码消除：无副作用的运算/赋值，若结果在当前位置之后不再活跃则不生成任何指令
+        # (保留除数为常量0的除法，使其仍能报告除0错误)
+        if ((op in _OP_INFO or op == '=') and type(result) is str and
+                (func_name, result) in mc.intervals and not mc.is_live_after((func_name, result), cur_pos) and
+                not (op == '/' and arg2 == 0)):
+            return code
+
+        # 算术与比较运算
+        if op in _OP_INFO:
+            inst, imm_inst, calc, zero_check = _OP_INFO[op]
+            result_reg = alloc(result, cur_pos, code=code, load=False)
 
-        # 参数调用
-        if op == 'param':
-            # 提取参数索引（从result中解析param1/param2等）
-            param_num = next((int(c) for c in result if c.isdigit()), None)
+            # 1. 处理两个立即数的情况
+            if arg1_is_int and arg2_is_int:
+                if op == '/' and arg2 == 0:
+                    raise ValueError("Division by zero")
+                
+                emit(f"li {result_reg}, {calc(arg1, arg2)}", f"计算 {arg1} {op} {arg2}")
+            
+            # 2. 处理变量与立即数的混合运算
+            elif (arg1_is_var and arg2_is_int) or (arg1_is_int and arg2_is_var):
+                is_var_first = arg1_is_var
+                var, const = (arg1, arg2) if is_var_first else (arg2, arg1)
 
-            # 参数有效性检查
-            if param_num is None or param_num < 1:
-                raise ErrorException(
-                    message=f"无效的参数寄存器格式: {result} (当前仅支持param1~param4)", 
-                    error_code=ErrorCode.InvalidParamRegisterFormat
-                )
+                # 除法零检查
+                if zero_check and is_var_first and const == 0:
+                    raise ValueError("除0异常: 除数不能为0")
+
+                # 加载变量寄存器
+                var_reg = alloc(var, cur_pos, code=code)
+
+                # 变量在左侧(加法可交换)且常量在16位范围内时直接使用立即数指令
+                imm = -const if op == '-' else const
+                if imm_inst and (is_var_first or op == '+') and IMM_MIN <= imm <= IMM_MAX:
+                    emit(f"{imm_inst} {result_reg}, {var_reg}, {imm}", f"{arg1} {op} {arg2} -> {result}")
+                else:
+                    emit(f"li {result_reg}, {const}", f"加载常量 {const}") # 先加载常量到结果寄存器
+                    if is_var_first:
+                        emit(f"{inst} {result_reg}, {var_reg}, {result_reg}", f"{var} - {const}")
+                    else:
+                        emit(f"{inst} {result_reg}, {result_reg}, {var_reg}", f"{const} - {var}")
+            
+            # 3. 处理两个变量的情况
+            elif arg1_is_var and arg2_is_var:
+                reg1 = alloc(arg1, cur_pos, code=code)
+                reg2 = alloc(arg2, cur_pos, code=code)
+                emit(f"{inst} {result_reg}, {reg1}, {reg2}", f"{arg1} {op} {arg2} -> {result}")
+
+            else:
+                raise ValueError(f"Unsupported operands for {op}: {arg1}, {arg2}")
+
+        # 参数调用
+        elif op == 'param':
+            # 参数序号已在初始化时解析
+            param_num = self.param_indices[result]
             
             # 参数寄存器范围检查
             if param_num > 4:
@@ -312,15 +735,14 @@ class AimCodeGenerator:
                 )
             
             # 获取目标寄存器
-            target_reg = self.mem_controller.pararegs[param_num - 1]  # 获取目标寄存器
-
-            if isinstance(arg1, str):
-                src_reg = self.mem_controller.alloc_reg(arg1, cur_pos, code=code)
-                self.mem_controller.rvalues[(f'param{param_num}', arg1)] = target_reg
-                code.append(f"    add {target_reg}, {src_reg}, $zero  # 将参数 {arg1} 存入寄存器 {target_reg}")
-            elif isinstance(arg1, int):
-                self.mem_controller.rvalues[(f'param{param_num}', arg1)] = target_reg
-                code.append(f"    li {target_reg}, {arg1}  # 将常量 {arg1} 存入寄存器 {target_reg}")       
+            target_reg = mc.pararegs[param_num - 1]  # 获取目标寄存器
+
+            # 函数自身的参数已在序言中移入变量寄存器，参数寄存器只用于传递实参
+            if arg1_is_var:
+                src_reg = alloc(arg1, cur_pos, code=code)
+                emit(f"add {target_reg}, {src_reg}, $zero", f"将参数 {arg1} 存入寄存器 {target_reg}")
+            elif arg1_is_int:
+                emit(f"li {target_reg}, {arg1}", f"将常量 {arg1} 存入寄存器 {target_reg}")
             else:
                 raise ErrorException(
                     message=f"无效的参数类型: {arg1}",
@@ -331,124 +753,62 @@ class AimCodeGenerator:
         # 调用函数
         elif op == 'call':
             # 函数调用前保护寄存器状态
-            live_vars = self.mem_controller.get_live_vars_after(cur_pos)
-            code.append(f"    # 函数调用保护寄存器状态")
-            for var in live_vars:
+            # 被调函数在所有寄存器释放后生成，会复用同样的寄存器，
+            # 因此调用后仍活跃的寄存器变量(包括临时变量)都要保存到栈帧
+            func_regs = mc.rvalues[func_name]
+            saved = []  # [(变量名, 寄存器, 栈帧偏移量)]
+            for var in mc.get_live_vars_after(cur_pos):
                 offset = frame.get_var_offset(var) if frame else None
-                if offset is not None:
-                    reg = self.mem_controller.rvalues.get((func_name, var), None)
-                    code.append(f"    sw {reg}, {offset}({self.mem_controller.spreg})  # 保存变量 {var} 到栈帧")
-
-            # 函数调用前分配栈帧空间
-            if frame:
-                code.append(f"    sw {self.mem_controller.spreg}, -{frame.size()}({self.mem_controller.spreg})  # 保存旧的栈顶指针")
-                code.append(f"    addi {self.mem_controller.spreg}, {self.mem_controller.spreg}, -{frame.size()}  # 分配栈帧空间")
-                code.append(f"    sw {self.mem_controller.rareg}, {-4}({self.mem_controller.spreg})  # 保存返回地址")
-            
-            # 调用函数
-            code.append(f"    jal {arg1}  # 调用函数 {arg1}")
+                if offset is None:
+                    raise ErrorException(
+                        message=f"变量 {var} 在 {func_name} 函数的栈帧中没有位置，无法在调用 {arg1} 前保存",
+                        error_code=ErrorCode.INTERNAL_COMPILER_ERR
+                    )
+                saved.append((var, func_regs[var], offset))
+
+            if comments:
+                append(f"    # 函数调用保护寄存器状态")
+            for var, reg, offset in saved:
+                emit(f"sw {reg}, {offset}({sp})", f"保存变量 {var} 到栈帧")
+
+            mc.drop_memory_vars(func_name)  # 内存变量已写回栈帧，调用后重新加载
+
+            # 调用函数(栈帧的分配和返回地址的保存由被调函数的序言完成)
+            emit(f"jal {arg1}", f"调用函数 {arg1}")
             
             # 函数调用后恢复寄存器状态
-            code.append(f"    lw {self.mem_controller.rareg}, {-4}({self.mem_controller.spreg})  # 恢复返回地址")
-            if frame:
-                code.append(f"    addi {self.mem_controller.spreg}, {self.mem_controller.spreg}, {frame.size()}  # 恢复栈顶指针")
-                for var in live_vars:
-                    offset = frame.get_var_offset(var) if frame else None
-                    if offset is not None:
-                        reg = self.mem_controller.rvalues.get((func_name, var), None)
-                        code.append(f"    lw {reg}, {offset}({self.mem_controller.spreg})  # 恢复变量 {var} 从栈帧")
-
-        elif op in ('+', '-', '*', '/', '<', '<=', '>', '>=', '==', '!='):
-            # 操作符到指令的映射
-            op_info = {
-                # 算术运算
-                '+': {'inst': 'add', 'imm_inst': 'add',  'calc': lambda a,b: a + b},
-                '-': {'inst': 'sub', 'imm_inst': 'sub',  'calc': lambda a,b: a - b},
-                '*': {'inst': 'mul', 'imm_inst': 'mul',  'calc': lambda a,b: a * b},
-                '/': {'inst': 'div', 'imm_inst': 'div',  'calc': lambda a,b: a // b, 'zero_check': True},
-
-                # 比较运算
-                '<':  {'inst': 'slt', 'imm_inst': 'slt', 'calc': lambda a,b: a < b},
-                '<=': {'inst': 'sle', 'imm_inst': 'sle', 'calc': lambda a,b: a <= b},
-                '>':  {'inst': 'sgt', 'imm_inst': 'sgt', 'calc': lambda a,b: a > b},
-                '>=': {'inst': 'sge', 'imm_inst': 'sge', 'calc': lambda a,b: a >= b},
-                '==': {'inst': 'seq', 'imm_inst': 'seq', 'calc': lambda a,b: a == b},
-                '!=': {'inst': 'sne', 'imm_inst': 'sne', 'calc': lambda a,b: a != b}
-            }
-            info = op_info[op]
-            result_reg = self.mem_controller.alloc_reg(result, cur_pos, code=code)
-
-            # 1. 处理两个立即数的情况
-            if isinstance(arg1, int) and isinstance(arg2, int):
-                if op == '/' and arg2 == 0:
-                    raise ValueError("Division by zero")
-                
-                code.append(f"    li {result_reg}, {info['calc'](arg1, arg2)}  # 计算 {arg1} {op} {arg2}")
-            
-            # 2. 处理变量与立即数的混合运算
-            elif (isinstance(arg1, str) and isinstance(arg2, int)) or (isinstance(arg1, int) and isinstance(arg2, str)):
-                is_var_first = isinstance(arg1, str)
-                var, const = (arg1, arg2) if is_var_first else (arg2, arg1)
-
-                # 除法零检查
-                if info.get('zero_check') and is_var_first and const == 0:
-                    raise ValueError("除0异常: 除数不能为0")
-
-                # 加载变量寄存器
-                var_reg = self.mem_controller.alloc_reg(var, cur_pos, code=code)
-                if frame and frame.if_var_in_memory(var):
-                    code.append(f"    lw {var_reg}, {frame.get_var_offset(var)}({self.mem_controller.spreg})  # 加载 {var}")
-                code.append(f"    li {result_reg}, {const}  # 加载常量 {const}") # 统一先加载常量到结果寄存器
-                if is_var_first:
-                    code.append(f"    {info['imm_inst']} {result_reg}, {var_reg}, {result_reg}  # {var} - {const}")
-                else:
-                    code.append(f"    {info['imm_inst']} {result_reg}, {result_reg}, {var_reg}  # {const} - {var}")
-            
-            # 3. 处理两个变量的情况
-            elif isinstance(arg1, str) and isinstance(arg2, str):
-                reg1 = self.mem_controller.alloc_reg(arg1, cur_pos, code=code)
-                reg2 = self.mem_controller.alloc_reg(arg2, cur_pos, code=code)
-
-                # 处理内存中的变量
-                for var, reg in [(arg1, reg1), (arg2, reg2)]:
-                    if frame and frame.if_var_in_memory(var):
-                        code.append(f"    lw {reg}, {frame.get_var_offset(var)}({self.mem_controller.spreg})  # 加载 {var}")
-
-                code.append(f"    {info['inst']} {result_reg}, {reg1}, {reg2}  # {arg1} {op} {arg2} -> {result}")
-
-            else:
-                raise ValueError(f"Unsupported operands for {op}: {arg1}, {arg2}")
+            for var, reg, offset in saved:
+                emit(f"lw {reg}, {offset}({sp})", f"恢复变量 {var} 从栈帧")
 
         # 无条件跳转
         elif op == 'j':
             func_name_jmp, block_idx = self.block_controller.get_scope_by_index(result)
             if func_name_jmp is None or block_idx is None:
                 raise ValueError(f"Jump target {result} not found")
-            code.append(f"    j {func_name_jmp}_block_{block_idx}  # 跳转到函数 {func_name_jmp} 的基本块 {block_idx}")
+            emit(f"j {func_name_jmp}_block_{block_idx}", f"跳转到函数 {func_name_jmp} 的基本块 {block_idx}")
 
         # 条件跳转（不等于）
         elif op == 'jnz':
-            reg = self.mem_controller.alloc_reg(arg1, cur_pos, code=code)
+            reg = alloc(arg1, cur_pos, code=code)
             func_name_jmp, block_idx = self.block_controller.get_scope_by_index(result)
             if func_name_jmp is None or block_idx is None:
                 raise ValueError(f"Jump target {result} not found")
-            code.append(f"    bne {reg}, $zero, {func_name_jmp}_block_{block_idx}  # 如果 {arg1} != 0 跳转到 {func_name_jmp}_block_{block_idx}")
+            emit(f"bne {reg}, $zero, {func_name_jmp}_block_{block_idx}", f"如果 {arg1} != 0 跳转到 {func_name_jmp}_block_{block_idx}")
 
         # 赋值跳转
         elif op == '=':
-            if isinstance(arg1, int):
-                reg = self.mem_controller.alloc_reg(result, cur_pos, code=code)
-                code.append(f"    li {reg}, {arg1}  # 将常量 {arg1} 赋值给 {result}")
-            elif isinstance(arg1, str):
+            if arg1_is_int:
+                reg = alloc(result, cur_pos, code=code, load=False)
+                emit(f"li {reg}, {arg1}", f"将常量 {arg1} 赋值给 {result}")
+            elif arg1_is_var:
                 if arg1 == '$ret_reg':
-                    result_reg = self.mem_controller.alloc_reg(result, cur_pos, code=code)
-                    code.append(f"    add {result_reg}, {self.mem_controller.retregs[0]}, $zero  # 将返回寄存器的值赋给 {result}")
+                    result_reg = alloc(result, cur_pos, code=code, load=False)
+                    emit(f"add {result_reg}, {mc.retregs[0]}, $zero", f"将返回寄存器的值赋给 {result}")
                 else:
-                    reg = self.mem_controller.alloc_reg(arg1, cur_pos, code=code)
-                    if frame and frame.if_var_in_memory(arg1):
-                        code.append(f"    lw {reg}, {frame.get_var_offset(arg1)}({self.mem_controller.spreg})  # 加载参数 {arg1} 到寄存器")
-                    result_reg = self.mem_controller.alloc_reg(result, cur_pos, code=code)
-                    code.append(f"    add {result_reg}, {reg}, $zero  # 将 {arg1} 的值赋给 {result}")
+                    reg = alloc(arg1, cur_pos, code=code)
+                    result_reg = alloc(result, cur_pos, code=code, load=False)
+                    if result_reg != reg:  # 合并后两端共享寄存器时无需移动
+                        emit(f"add {result_reg}, {reg}, $zero", f"将 {arg1} 的值赋给 {result}")
             else:
                 raise ValueError(f"Unsupported assignment: {arg1} to {result}")
 
@@ -456,23 +816,33 @@ class AimCodeGenerator:
         elif op == 'RETURN':
             func_name_ret, _ = self.block_controller.get_scope_by_index(index=index)
             if func_name_ret == "main":
-                code.append("    li $v0, 10  # syscall: exit")
-                code.append("    syscall")
+                emit("li $v0, 10", "syscall: exit")
+                append("    syscall")
             else:
-                if isinstance(arg1, str):
-                    return_reg = self.mem_controller.retregs[0]
-                    reg = self.mem_controller.alloc_reg(arg1, cur_pos, code=code)
-                    code.append(f"    add {return_reg}, {reg}, $zero  # 将 {arg1} 的值作为返回值")
-                    code.append(f"    jr $ra  # 返回到调用点")
-                elif isinstance(arg1, int):
-                    return_reg = self.mem_controller.retregs[0]
-                    code.append(f"    li {return_reg}, {arg1}  # 将常量 {arg1} 作为返回值")
-                    code.append(f"    jr $ra  # 返回到调用点")
-                elif arg1 is None:
-                    code.append(f"    jr $ra  # 无返回值，直接返回")
-                else:
+                if arg1_is_var:
+                    return_reg = mc.retregs[0]
+                    reg = alloc(arg1, cur_pos, code=code)
+                    emit(f"add {return_reg}, {reg}, $zero", f"将 {arg1} 的值作为返回值")
+                elif arg1_is_int:
+                    return_reg = mc.retregs[0]
+                    emit(f"li {return_reg}, {arg1}", f"将常量 {arg1} 作为返回值")
+                elif arg1 is not None:
                     raise ValueError(f"Unsupported return value: {arg1}")
-            code.append("     ")
+
+                # 函数尾声：恢复返回地址并释放栈帧
+                if frame:
+                    frame_size = frame.size()
+                    emit(f"lw {ra}, {frame_size - 4}({sp})", "恢复返回地址")
+                    emit(f"addi {sp}, {sp}, {frame_size}", "释放栈帧空间")
+                if arg1 is None:
+                    emit("jr $ra", "无返回值，直接返回")
+                else:
+                    emit("jr $ra", "返回到调用点")
+            append("     ")
+
+        # 内存变量被定值后立即写回栈帧
+        if (op in _OP_INFO or op == '=') and mc.memory_vars:
+            mc.write_back(func_name, result, code)
 
         return code
             
@@ -482,40 +852,72 @@ class AimCodeGenerator:
             
     def generate_code(self):
         """生成目标代码"""
-        
-        # 生成.data段(没有全局变量和常量，因此为空)
-        self.code.append(".data")
-        self.code.append("     ")
-        # 生成.text段
-        self.code.append(".text")
-        self.code.append(".globl main")
-        self.code.append("     ")
+        # 生成.data段(没有全局变量和常量，因此为空)和.text段
+        self.code.extend((".data", "     ", ".text", ".globl main", "     "))
         
         # 按函数处理四元式
         for func_name, blocks in self.block_controller.func_blocks.items():
-            frame = self.function_stack.build_frame(func_name) # 创建函数栈帧
-            self.code.append(f"{func_name}:")
-            self.labels[func_name] = []
-
-            # 处理函数参数
-            for i, param in enumerate(frame.params):
-                # 把寄存器中存在(parami, xxx)的parami改成func_name
-                for key in list(self.mem_controller.rvalues.keys()):
-                    if key[0] == f'param{i+1}':
-                        temp = self.mem_controller.rvalues[key]
-                        self.mem_controller.rvalues[(func_name, param[0])] = temp
-                        del self.mem_controller.rvalues[key]
-                        break  # 一般只会有一个，找到就可以break
+            frame = self.function_stack.build_frame(func_name, self.frame_vars.get(func_name)) # 创建函数栈帧
+
+            # 生成过程中有寄存器变量被让渡时，把它们改为内存变量后重新生成整个函数，
+            # 直到所有寄存器变量都能在整个活跃区间内占有同一个寄存器
+            start = len(self.code)
+            memory_vars: Set[str] = set()
+            while True:
+                del self.code[start:]
+                self._generate_function(func_name, blocks, frame, memory_vars)
+                spilled = self.mem_controller.spilled_vars
+                if not spilled:
+                    break
+                memory_vars.update(var for _, var in spilled)
+                logger.debug(f"函数 {func_name} 中的变量 {sorted(var for _, var in spilled)} 改为内存变量，重新生成")
+
+    def _generate_function(self, func_name: str, blocks: list, frame: FunctionStackFrame, memory_vars: Set[str]):
+        """生成单个函数的目标代码(追加到self.code)"""
+        emit_line = self.code.append  # 缓存追加方法，避免循环中重复的属性查找
+        emit_lines = self.code.extend
+        emit = partial(self.mem_controller.emit, self.code)
+        quad_to_code = self.quad_to_code
+        mc = self.mem_controller
+
+        emit_line(f"{func_name}:")
+
+        # 函数序言：分配栈帧空间并保存返回地址(main通过syscall退出，无需保存返回地址)
+        frame_size = frame.size()
+        emit(f"addi {SP_REG}, {SP_REG}, -{frame_size}", "分配栈帧空间")
+        if func_name != "main":
+            emit(f"sw {RA_REG}, {frame_size - 4}({SP_REG})", "保存返回地址")
+        labels = self.labels[func_name] = []
+        mc.enter_function(func_name, memory_vars)      # 释放上一个函数占用的寄存器
+
+        # 处理函数参数: 从参数寄存器移入变量寄存器(内存变量直接存入栈帧)，之后与普通变量一样分配，
+        # 参数寄存器在调用其他函数传参时可以直接覆盖
+        if len(frame.params) > len(ARG_REGS):
+            raise ErrorException(
+                message=f"函数 {func_name} 的参数超过 {len(ARG_REGS)} 个 (当前仅支持至多4个参数传递)",
+                error_code=ErrorCode.PARAM_LIMIT
+            )
+        entry_pos = (func_name, 0, 0)
+        for arg_reg, (param, offset) in zip(ARG_REGS, frame.params):
+            if (func_name, param) not in mc.intervals:  # 未使用的参数无需移动
+                continue
+            if param in memory_vars:
+                emit(f"sw {arg_reg}, {offset}({SP_REG})", f"参数 {param} 存入栈帧")
+            else:
+                reg = mc.alloc_reg(param, entry_pos, self.code, load=False)
+                emit(f"add {reg}, {arg_reg}, $zero", f"参数 {param}")
+        
+        # 根据基本块划分生成函数标签
+        for block_idx, block in enumerate(blocks):
+            label = self.create_label(func_name, block_idx)
+            labels.append(label)
+            emit_line(f"{label}:")
+            mc.drop_memory_vars(func_name)  # 基本块可能从多个前驱进入，内存变量从栈帧重新加载
             
-            # 根据基本块划分生成函数标签
-            for block_idx, block in enumerate(blocks):
-                label = self.create_label(func_name, block_idx)
-                self.labels[func_name].append(label)
-                self.code.append(f"{label}:")
-                
-                # 处理每个基本块中的四元式
-                for q_idx, (quad_idx, quad) in enumerate(block):
-                    cur_pos = (func_name, block_idx, q_idx)
-                    code_lines = self.quad_to_code((quad_idx, quad), cur_pos)
-                    self.code.extend(code_lines)
-    
\ No newline at end of file
+            # 处理每个基本块中的四元式
+            for q_idx, quad_with_index in enumerate(block):
+                emit_lines(quad_to_code(quad_with_index, (func_name, block_idx, q_idx), frame))
+
+    def get_asm_text(self) -> str:
+        """返回完整的目标代码文本(各行以换行符连接，末尾带换行)"""
+        return "\n".join(self.code) + "\n" if self.code else ""
@@ -1,14 +1,11 @@
-import time, threading, os
+import time, threading, os, functools, json, io, sys, bisect
 from typing import List
 from PIL import Image, ImageTk
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox, filedialog
-from graphviz import Digraph
+from tkinter import ttk, scrolledtext, messagebox, filedialog, font as tkfont
 from pygments import lex
-from pygments.lexers import RustLexer
 from compiler_lexer import Lexer
 from compiler_parser import Parser
-from compiler_parser_node import ParseNode
 from compiler_semantic_checker import SemanticChecker
 from compiler_codegenerator import Quadruple
 from compiler_rust_grammar import RUST_GRAMMAR_PPT
@@ -19,11 +16,66 @@ from compiler_aimcodegenerator import AimCodeGenerator
 import re
 
 
+# LR(1)分析表的磁盘缓存目录
+TABLE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".rs-lang-compiler")
+
+# 代码高亮按行块应用到可见区域，每块的行数
+HIGHLIGHT_BLOCK = 100
+
+# 表格奇偶行的标签
+_ROW_TAGS = ('evenrow', 'oddrow')
+
+# 目标代码高亮的合并正则(分组名即标签名)
+# 注释优先并吞掉行尾；段声明/标号只在行首匹配；寄存器先于常数匹配，寄存器名中的数字不会被当作常数
+_ASM_TOKEN_RE = re.compile(
+    r"(?P<comment>#.*)"
+    r"|(?P<section>^[^\S\n]*\.\w+)"
+    r"|(?P<label>^[^\S\n]*[\w\.]+:)"
+    r"|(?P<register>\$[a-zA-Z0-9]+)"
+    r"|(?P<instr>\b(?:li|add|sub|mul|div|lw|sw|move|syscall|j|jal|jr|bne|beq|slt|slti|sll|srl|and|or|xor|nor|la|lb|sb|sllv|srlv|srav|mfhi|mflo|nop|sgt|addi|sne|sge|seq|sle)\b)"
+    r"|(?P<number>\b\d+\b)",
+    re.MULTILINE | re.ASCII  # 目标代码只含ASCII标识符，ASCII模式下\w/\b/\d匹配更快
+)
+_NEWLINE_RE = re.compile('\n')
+
+
+def _configure_row_tags(tree: ttk.Treeview, even_bg: str = '#ebf8ff'):
+    """为表格配置奇偶行交错背景色(创建表格时调用一次，之后插入行只需引用标签)"""
+    tree.tag_configure(_ROW_TAGS[0], background=even_bg)
+    tree.tag_configure(_ROW_TAGS[1], background='#ffffff')
+
+
+@functools.lru_cache(maxsize=None)
+def _get_rust_lexer():
+    """获取共享的RustLexer实例(只创建一次，避免重复编译正则表达式；首次使用时才导入)"""
+    from pygments.lexers import RustLexer
+    return RustLexer(stripnl=False, ensurenl=False)
+
+
 class CodeHighlighter:
-    def __init__(self, text_widget, rust_example):
+    def __init__(self, text_widget, rust_example, get_text=None):
+        """
+        Args:
+            text_widget: 需要高亮的文本控件
+            rust_example: 占位示例文本(不做高亮)
+            get_text: 获取控件全文的函数，默认直接从控件读取；可传入带缓存的实现
+        """
         self.text_widget = text_widget
-        self.lexer = RustLexer()
+        self.lexer = _get_rust_lexer()
         self.rust_example = rust_example
+        self.get_text = get_text or (lambda: text_widget.get("1.0", "end-1c"))
+
+        # 高亮结果缓存：文本内容未变化时跳过重新高亮
+        self._last_text_hash = None  # 上次高亮的文本哈希
+        self._last_line_count = None # 上次高亮时的行数(用于判断能否只做局部高亮)
+
+        # 只为可见区域打标签：全文词法分析结果按行缓存，滚动到未打标签的行块时再应用
+        self._spans = None            # [(起始行, 结束行, 标签名, 起始位置, 结束位置), ...]，None表示需重新分析
+        self._span_lines = []         # 与_spans对应的起始行列表(用于二分查找)
+        self._applied_blocks = set()  # 已应用标签的行块编号(每块HIGHLIGHT_BLOCK行)
+
+        # 可能跨行的token类型(字符串/块注释)，编辑区域涉及它们时退回整体高亮
+        self.multiline_tags = {str(Token.String), str(Token.Comment.Multiline)}
 
         # 定义颜色样式
         self.style = {
@@ -39,15 +91,26 @@ class CodeHighlighter:
             Token.Comment.Multiline: '#888888'  # 灰色
         }
 
+        # 缓存token类型对应的标签名(驻留字符串)，避免高亮时重复调用str()
+        self.tag_names = {token_type: sys.intern(str(token_type)) for token_type in self.style}
+
         # 创建标签
-        for token_type in self.style:
-            self.text_widget.tag_configure(str(token_type),
+        for token_type, tag_name in self.tag_names.items():
+            self.text_widget.tag_configure(tag_name,
                                            foreground=self.style[token_type])
 
     def highlight(self):
         # 检查是否为示例文本
-        text = self.text_widget.get("1.0", "end-1c")
+        text = self.get_text()
+        text_hash = hash(text)
+        if text_hash == self._last_text_hash:
+            return  # 内容未变化，现有高亮仍然有效
+        self._last_text_hash = text_hash
+        self._last_line_count = self._line_count()
+
+        self._applied_blocks.clear()
         if text == self.rust_example:
+            self._spans, self._span_lines = [], []
             for tag in self.text_widget.tag_names():
                 if tag != "placeholder":
                     self.text_widget.tag_remove(tag, "1.0", "end")
@@ -57,21 +120,116 @@ class CodeHighlighter:
         for tag in self.text_widget.tag_names():
             self.text_widget.tag_remove(tag, "1.0", "end")
 
-        # 使用pygments进行词法分析
+        self._set_spans(self._lex_spans(text, 1))
+        self.highlight_visible()
+
+    def highlight_visible(self):
+        """为当前可见的行块应用缓存的高亮(已应用的行块直接跳过)"""
+        if self._last_text_hash is None:
+            return  # 尚未高亮过(如仍显示示例文本)
+        widget = self.text_widget
+        first_line = int(widget.index("@0,0").split('.')[0])
+        last_line = int(widget.index(f"@0,{widget.winfo_height()}").split('.')[0])
+        blocks = [b for b in range((first_line - 1) // HIGHLIGHT_BLOCK, (last_line - 1) // HIGHLIGHT_BLOCK + 1)
+                  if b not in self._applied_blocks]
+        if not blocks:
+            return
+        if self._spans is None:  # 局部编辑后缓存已失效，重新对全文做词法分析
+            self._set_spans(self._lex_spans(self.get_text(), 1))
+
+        spans, span_lines = self._spans, self._span_lines
+        for block in blocks:
+            lo, hi = block * HIGHLIGHT_BLOCK + 1, (block + 1) * HIGHLIGHT_BLOCK
+            i = bisect.bisect_left(span_lines, lo)
+            if i > 0 and spans[i - 1][1] >= lo:
+                i -= 1  # 从上一块延续下来的跨行token
+            j = bisect.bisect_right(span_lines, hi)
+
+            for tag in self.tag_names.values():
+                widget.tag_remove(tag, f"{lo}.0", f"{hi}.end")
+            for tag, indices in self._group_spans(spans[i:j]).items():
+                widget.tag_add(tag, *indices)
+            self._applied_blocks.add(block)
+
+    def highlight_range(self, start: str, end: str):
+        """
+            只重新高亮[start, end)范围内的行
+
+        Args:
+            start: 起始位置(行首)，如 "12.0"
+            end: 结束位置，如 "13.0"
+
+        Note:
+            行数变化超过一行(粘贴/删除多行)、编辑位置处于字符串或块注释中、
+            或编辑的行中含有可能跨行的token起止符号时，退回整体高亮
+        """
+        widget = self.text_widget
+        text = self.get_text()
+        text_hash = hash(text)
+        if text_hash == self._last_text_hash:
+            return
+
+        line_count = self._line_count()
+        line_delta = None if self._last_line_count is None else line_count - self._last_line_count
+        start_line = int(widget.index(start).split('.')[0])
+        if line_delta == 1 and start_line > 1:
+            start_line -= 1  # 回车把一行拆成两行，上一行也需要重新高亮
+        start = f"{start_line}.0"
+
+        segment = widget.get(start, end)
+        if (text == self.rust_example or line_delta is None or abs(line_delta) > 1 or
+                any(mark in segment for mark in ('"', '/*', '*/')) or
+                self.multiline_tags.intersection(widget.tag_names(f"{start} -1c"))):
+            self.highlight()
+            return
+
+        self._last_text_hash = text_hash
+        self._last_line_count = line_count
+        self._spans = None  # 局部更新后缓存的全文结果不再有效
+        if line_delta:
+            self._applied_blocks.clear()  # 行号整体偏移，未显示的行块需重新应用
+
+        for tag in self.tag_names.values():
+            widget.tag_remove(tag, start, end)
+        for tag, indices in self._group_spans(self._lex_spans(segment, start_line)).items():
+            widget.tag_add(tag, *indices)
+
+    def _line_count(self) -> int:
+        """文本中的换行数(直接取Tk记录的末行行号，无需扫描全文)"""
+        return int(self.text_widget.index("end-1c").split('.')[0]) - 1
+
+    def _set_spans(self, spans: list):
+        """保存全文词法分析结果"""
+        self._spans = spans
+        self._span_lines = [span[0] for span in spans]
+
+    @staticmethod
+    def _group_spans(spans) -> dict:
+        """按标签归并区间，返回 {标签名: [起始位置, 结束位置, ...]}，每个标签只需一次tag_add"""
+        ranges = {}
+        for _, _, tag, start, end in spans:
+            ranges.setdefault(tag, []).extend((start, end))
+        return ranges
+
+    def _lex_spans(self, text: str, first_line: int) -> list:
+        """对文本做词法分析，返回需要高亮的token [(起始行, 结束行, 标签名, 起始位置, 结束位置), ...](行号从first_line开始)"""
+        # 使用pygments进行词法分析，单遍遍历token并累计行列号得到每个token的位置
+        tag_names = self.tag_names
+        spans = []
+        line, col = first_line, 0
         for token, content in lex(text, self.lexer):
-            if token in self.style:
-                self._highlight_token(token, content)
-
-    def _highlight_token(self, token, content):
-        """高亮单个token"""
-        start = "1.0"
-        while True:
-            pos = self.text_widget.search(content, start, stopindex="end")
-            if not pos:
-                break
-            end = f"{pos}+{len(content)}c"
-            self.text_widget.tag_add(str(token), pos, end)
-            start = end
+            newlines = content.count('\n')
+            if newlines:
+                end_line, end_col = line + newlines, len(content) - content.rfind('\n') - 1
+            else:
+                end_line, end_col = line, col + len(content)
+
+            # 直接以token类型为键查找(短元组哈希开销很小，实测比按id()查找更快)
+            tag = tag_names.get(token)
+            if tag is not None and content:
+                spans.append((line, end_line, tag, f"{line}.{col}", f"{end_line}.{end_col}"))
+            line, col = end_line, end_col
+        return spans
 
 class GrammarVisualizerApp:
     """词法分析->语法分析->语义分析"""
@@ -93,17 +251,33 @@ class GrammarVisualizerApp:
         self.ast_tree_root = None  # 语法树根节点
         self.current_step = 0
         self.analysis_details = []
+        self.analysis_code = ""    # 被分析的源代码(分析步骤中只记录剩余输入的偏移)
 
         # 语法树可视化相关变量
         self.tree_scale = 1.0
         self.tree_offset_x = 0
         self.tree_offset_y = 0
         self.drag_data = {"x": 0, "y": 0, "item": None}
+        self._ast_src_img = None    # Graphviz渲染并解码后的AST原图，每次分析只渲染/解码一次
+        self._ast_imgtk_cache = {}  # 缩放档位(scale*10取整) -> PhotoImage
+        self._zoom_after_id = None  # 待执行的语法树缩放重绘(after任务ID)
+        self._zoom_settle_id = None # 缩放停止后的精细重绘(after任务ID)
+
+        self._gutter_digits = None  # 行号区当前按几位数字计算宽度
+
+        # 编辑器全文缓存：文本变化时置脏，读取时才重新从控件复制
+        self._editor_text_cache = ""
+        self._editor_text_dirty = True
+
+        # 编辑器刷新(行号/高亮)的延迟合并
+        self._pending_highlight = None  # 待执行的after任务ID
+        self._dirty_lines = None        # 待刷新的行范围 (起始行, 结束行)
+        self._pending_visible = None    # 待执行的可见区域高亮(after_idle任务ID)
 
         # 分析器实例
         # self.lexer = Lexer()            # 词法分析器Lexer(变为子程序)
-        self.parser = Parser()            # 语法分析器Parser
-        self.checker = SemanticChecker()  # 语义检查器Checker(内置中间代码生成器)
+        self.parser = None                # 语法分析器Parser(在加载线程中创建)
+        self.checker = None               # 语义检查器Checker(内置中间代码生成器，在加载线程中创建)
         self.aim_code_geynerator = None   # AIM中间代码生成器 分析过程中生成
         self.asmcode = None               # AIM中间代码
         self.cfgs = None                  # 控制流图列表
@@ -111,6 +285,8 @@ class GrammarVisualizerApp:
         # Notebook组件初始化
         self.tree_notebook = None      # 语法分析树/ACTION表/GOTO表
         self.analysis_notebook = None  # 语法定义/分析过程/中间代码
+        self._tab_builders = {}        # 标签页id -> 首次选中时的内容填充函数
+        self._row_insert_tokens = {}   # 表格 -> 当前分批插入任务的标识(用于作废过期的插入)
         self.process_btn_frame = None  # 在__init__中初始化
         
         # CFG可视化相关变量
@@ -118,11 +294,43 @@ class GrammarVisualizerApp:
         self.cfg_offset_x = 10
         self.cfg_offset_y = 10
         self.cfg_drag_data = {"x": 0, "y": 0}
+        self._cfg_layouts = {}  # 函数名 -> (节点列表, 边列表)，Graphviz布局坐标，缩放/拖动/切换函数时复用
+        self._cfg_pending = set()  # 正在后台计算布局的函数名
 
         # UI初始化
         self.create_loading_screen()   # 创建加载界面
         self.start_parsing_in_thread() # 启动解析线程
 
+    def _do_refresh(self):
+        """执行延迟的编辑器刷新：更新行号并重新高亮被修改的行"""
+        self._pending_highlight = None
+        first_line, last_line = self._dirty_lines or (1, 1)
+        self._dirty_lines = None
+
+        self.update_line_numbers()   # 更新行号
+        # 只重新高亮被修改的行(必要时高亮器会退回整体高亮)
+        self.highlighter.highlight_range(f"{first_line}.0", f"{last_line}.end +1c")
+
+    def _schedule_visible_highlight(self, event=None):
+        """在空闲时为可见区域应用高亮(同一空闲周期内的多次请求只执行一次)"""
+        if self._pending_visible is None:
+            self._pending_visible = self.root.after_idle(self._do_visible_highlight)
+
+    def _do_visible_highlight(self):
+        self._pending_visible = None
+        self.highlighter.highlight_visible()
+
+    def _invalidate_editor_text(self, event=None):
+        """编辑器内容(可能)发生变化，下次读取时重新获取全文"""
+        self._editor_text_dirty = True
+
+    def _get_editor_text(self) -> str:
+        """获取编辑器全文(end-1c)，内容未变化时直接返回缓存"""
+        if self._editor_text_dirty:
+            self._editor_text_cache = self.code_editor.get("1.0", "end-1c")
+            self._editor_text_dirty = False
+        return self._editor_text_cache
+
     def create_widgets(self):
         """创建主界面布局"""
         # 设置全局样式
@@ -141,16 +349,12 @@ class GrammarVisualizerApp:
         code_frame = ttk.LabelFrame(left_panel, text="源代码编辑器", relief="solid", borderwidth=1)
         code_frame.pack(fill=tk.BOTH, expand=True, pady=5)
 
-        # 行号区域
-        self.line_numbers = tk.Text(
+        # 行号区域(画布上只绘制可见行的行号)
+        self.gutter_font = tkfont.Font(family='Consolas', size=11)
+        self.line_numbers = tk.Canvas(
             code_frame,
-            width=4,
-            padx=4,
-            pady=4,
-            state='disabled',
+            width=self.gutter_font.measure('0' * 4) + 8,
             bg='#f5f5f5',
-            fg='#666666',
-            font=('Consolas', 11),
             bd=0,  # 无边框
             highlightthickness=1,
             highlightbackground="#e0e0e0"  # 仅右侧边框
@@ -171,9 +375,11 @@ class GrammarVisualizerApp:
 
         # 同步滚动
         def sync_scroll(*args):
-            self.line_numbers.yview_moveto(args[0])
+            self.update_line_numbers()  # 按新的可见范围重绘行号
             self.code_editor.yview_moveto(args[0])
+            self._schedule_visible_highlight()  # 滚动后为新露出的行应用高亮
         self.code_editor.config(yscrollcommand=sync_scroll)
+        self.code_editor.bind("<Configure>", self._schedule_visible_highlight, add="+")
         self.code_editor.tag_configure("sel", background="#b5d5ff", foreground="black")
         
         # 设置示例代码
@@ -186,7 +392,11 @@ class GrammarVisualizerApp:
         )
 
         # 创建代码高亮器
-        self.highlighter = CodeHighlighter(self.code_editor, self.RUST_EXAMPLE)
+        self.highlighter = CodeHighlighter(self.code_editor, self.RUST_EXAMPLE, get_text=self._get_editor_text)
+
+        # 任何可能修改内容的输入都使全文缓存失效
+        for sequence in ("<KeyPress>", "<<Paste>>", "<<Cut>>"):
+            self.code_editor.bind(sequence, self._invalidate_editor_text, add="+")
 
         # 绑定Ctrl+A全选事件
         def select_all_text(event=None):
@@ -200,14 +410,28 @@ class GrammarVisualizerApp:
         
         # 绑定文本修改事件
         def on_text_modified(event=None):
+            # 修改标志已被清零(由下面的edit_modified(0)或插入示例文本后的清零引起)时无需刷新
+            if not self.code_editor.edit_modified():
+                return
             self.code_editor.edit_modified(0)
-            self.update_line_numbers()   # 更新行号
-            self.highlighter.highlight() # 高亮代码
+            self._invalidate_editor_text()
+
+            # 记录被修改的行范围，连续的修改事件合并为一次延迟刷新
+            line = int(self.code_editor.index("insert").split('.')[0])
+            if self._dirty_lines is None:
+                self._dirty_lines = (line, line)
+            else:
+                self._dirty_lines = (min(self._dirty_lines[0], line), max(self._dirty_lines[1], line))
+
+            if self._pending_highlight is not None:
+                self.root.after_cancel(self._pending_highlight)
+            self._pending_highlight = self.root.after(40, self._do_refresh)
         self.code_editor.bind('<<Modified>>', on_text_modified)
-        self.code_editor.edit_modified(0) 
 
-        # 插入文本到编辑器
+        # 插入文本到编辑器(示例文本无需高亮：立即清零修改标志，跳过随后排队到达的<<Modified>>)
         self.code_editor.insert(tk.END, self.RUST_EXAMPLE)
+        self.code_editor.edit_modified(0)
+        self._invalidate_editor_text()
         self.code_editor.tag_configure("placeholder", foreground='#b0b0b0')
         self.code_editor.tag_add("placeholder", "1.0", "end")
         self.code_editor.config(foreground='#b0b0b0')
@@ -217,9 +441,10 @@ class GrammarVisualizerApp:
             # 允许删除操作
             if event.keysym in ('BackSpace', 'Delete'):
                 # 确保placeholder被移除
-                content = self.code_editor.get("1.0", "end-1c")
+                content = self._get_editor_text()
                 if content == self.RUST_EXAMPLE:
                     self.code_editor.delete("1.0", tk.END)
+                    self._invalidate_editor_text()
                     self.code_editor.tag_remove("placeholder", "1.0", "end")
                     self.code_editor.config(foreground='black')
                 return
@@ -228,9 +453,10 @@ class GrammarVisualizerApp:
                 return  # 跳过全选操作的处理
                 
             # 处理首次点击/输入
-            content = self.code_editor.get("1.0", "end-1c")
+            content = self._get_editor_text()
             if content == self.RUST_EXAMPLE:
                 self.code_editor.delete("1.0", tk.END)
+                self._invalidate_editor_text()
                 self.code_editor.tag_remove("placeholder", "1.0", "end")
                 self.code_editor.config(foreground='black')
             elif not content.strip():
@@ -266,6 +492,7 @@ class GrammarVisualizerApp:
         # 使用Notebook切换不同视图
         self.tree_notebook = ttk.Notebook(tree_frame)
         self.tree_notebook.pack(fill=tk.BOTH, expand=True)
+        self.tree_notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
 
         # 语法分析树标签页
         tree_tab = ttk.Frame(self.tree_notebook)
@@ -297,46 +524,13 @@ class GrammarVisualizerApp:
         self.action_table.configure(xscrollcommand=h_scrollbar.set)
         h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
 
-        # 设置ACTION表列 - 从解析器中获取实际的终结符
-        try:
-            # 获取所有可能的终结符
-            terminals = sorted({k for state in self.parser.action.values() for k in state.keys()})
-
-            # 设置列
-            columns = ["state"] + terminals
-            self.action_table["columns"] = columns
-            self.action_table.column("#0", width=80, anchor="center")  # 状态列
-            self.action_table.heading("#0", text="状态")
-
-            # 添加表头
-            for col in columns:
-                self.action_table.column(col, width=80, anchor="center")
-                self.action_table.heading(col, text=col)
-
-            # 填充数据 - 从解析器中获取实际的ACTION表数据
-            for state in sorted(self.parser.action.keys()):
-                values = [state] + [self.parser.action[state].get(term, "") for term in terminals]
-                tag = 'evenrow' if state % 2 == 0 else 'oddrow'
-                self.action_table.insert("", "end", values=values, tags=(tag,))
-
-        except Exception as e:
-            # 如果获取失败，使用示例数据作为后备
-            self.action_table["columns"] = ("state", "id", "plus", "mul", "lparen", "rparen", "$")
-            for col in self.action_table["columns"]:
-                self.action_table.heading(col, text=col)
-                self.action_table.column(col, width=80, anchor='center')
-
-            for i in range(10):
-                self.action_table.insert("", tk.END, values=(
-                    f"s{i}", f"r{i}", "s1", "s2", "s3", "s4", "acc"
-                ), tags=('evenrow' if i % 2 == 0 else 'oddrow',))
-
         # 添加滚动条
         scrollbar = ttk.Scrollbar(action_tab, orient="vertical", command=self.action_table.yview)
         self.action_table.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.action_table.pack(fill=tk.BOTH, expand=True)
         self.tree_notebook.add(action_tab, text="ACTION表")
+        self._tab_builders[str(action_tab)] = self._build_action_tab
 
         # GOTO表标签页
         goto_tab = ttk.Frame(self.tree_notebook)
@@ -351,52 +545,17 @@ class GrammarVisualizerApp:
         self.goto_table.configure(xscrollcommand=h_scrollbar_goto.set)
         h_scrollbar_goto.pack(side=tk.BOTTOM, fill=tk.X)
 
-        # 设置GOTO表列 - 从解析器中获取实际的非终结符
-        try:
-            # 获取所有可能的非终结符
-            non_terminals = sorted({k for state in self.parser.goto_tbl.values() for k in state.keys()})
-
-            # 设置列
-            columns = ["state"] + non_terminals
-            self.goto_table["columns"] = columns
-            self.goto_table.column("#0", width=80, anchor="center")
-            self.goto_table.heading("#0", text="状态")
-
-            # 添加表头
-            for col in columns:
-                self.goto_table.column(col, width=80, anchor="center")
-                self.goto_table.heading(col, text=col)
-
-            # 填充数据 - 从解析器中获取实际的GOTO表数据
-            for idx, state in enumerate(sorted(self.parser.goto_tbl.keys())):
-                values = [state] + [self.parser.goto_tbl[state].get(nt, "") for nt in non_terminals]
-                tag = 'evenrow' if idx % 2 == 0 else 'oddrow'
-                self.goto_table.insert("", "end", values=values, tags=(tag,))
-
-        except Exception as e:
-            # 如果获取失败，使用示例数据作为后备
-            self.goto_table["columns"] = ("state", "E", "T", "F")
-            for col in self.goto_table["columns"]:
-                self.goto_table.heading(col, text=col)
-                self.goto_table.column(col, width=80, anchor='center')
-
-            for i in range(10):
-                self.goto_table.insert("", tk.END, values=(
-                    i, i + 1, i + 2, i + 3
-                ), tags=('evenrow' if i % 2 == 0 else 'oddrow',))
-
         # 添加滚动条
         scrollbar = ttk.Scrollbar(goto_tab, orient="vertical", command=self.goto_table.yview)
         self.goto_table.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.goto_table.pack(fill=tk.BOTH, expand=True)
         self.tree_notebook.add(goto_tab, text="GOTO表")
+        self._tab_builders[str(goto_tab)] = self._build_goto_tab
 
         # 设置交错背景色
-        self.action_table.tag_configure('evenrow', background='#ebf8ff')
-        self.action_table.tag_configure('oddrow', background='#ffffff')
-        self.goto_table.tag_configure('evenrow', background='#ebf8ff')
-        self.goto_table.tag_configure('oddrow', background='#ffffff')
+        _configure_row_tags(self.action_table)
+        _configure_row_tags(self.goto_table)
         
         # ------------------- 控制流图区域 -----------------------
         cfg_tab = ttk.Frame(self.tree_notebook)
@@ -411,11 +570,7 @@ class GrammarVisualizerApp:
         self.cfg_canvas.pack(fill=tk.BOTH, expand=True)
 
         self.tree_notebook.add(cfg_tab, text="控制流图")
-        
-        self.cfg_canvas.bind("<MouseWheel>", self.zoom_cfg)
-        self.cfg_canvas.bind("<ButtonPress-1>", self.start_cfg_drag)
-        self.cfg_canvas.bind("<B1-Motion>", self.on_cfg_drag)
-        self.cfg_canvas.bind("<ButtonRelease-1>", self.end_cfg_drag)
+        self._tab_builders[str(cfg_tab)] = self._build_cfg_tab
 
         # ------------------- 按钮控制区域 -------------------
         control_frame = ttk.Frame(right_panel)
@@ -449,6 +604,7 @@ class GrammarVisualizerApp:
         # 使用Notebook切换不同视图
         self.analysis_notebook = ttk.Notebook(analysis_frame)
         self.analysis_notebook.pack(fill=tk.BOTH, expand=True)
+        self.analysis_notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
 
         # 语法定义标签页
         grammar_tab = ttk.Frame(self.analysis_notebook)
@@ -473,42 +629,8 @@ class GrammarVisualizerApp:
         self.grammar_editor.column("lhs", width=100, anchor='center')
         self.grammar_editor.column("rhs", width=400, anchor='w')
 
-        # 插入语法产生式
-        try:
-            idx = 0
-            for lhs in self.parser.rules.keys():  # productions -> rules
-                for prod in self.parser.rules[lhs]:
-                    rhs = prod['rhs']
-                    rhs_str = ' '.join(rhs) if rhs else 'ε'
-                    tag = 'evenrow' if idx % 2 == 0 else 'oddrow'
-                    self.grammar_editor.insert("", tk.END,
-                                               values=(idx, lhs, rhs_str),
-                                               tags=(tag,))
-                    idx += 1
-        except Exception as e:
-            # 如果解析器数据不可用，使用示例数据
-            grammar_data = [
-                (0, "Begin", "Program"),
-                (1, "JFuncStart", "ε"),
-                (2, "Program", "JFuncStart DeclarationString"),
-                (3, "DeclarationStrin", "Declaration DeclarationString"),
-                (4, "DeclarationStrin", "Declaration"),
-                (5, "Declaration", "FunctionDeclaration"),
-                (6, "FunctionDeclara1", "FunctionHeaderDeclaration FunctionExpressionBlock"),
-                (7, "FunctionDeclara1", "FunctionHeaderDeclaration Block"),
-                (8, "FunctionHeaderD", "fn ID (Parameters)"),
-                (9, "FunctionHeaderD", "fn ID ("),
-                (10, "FunctionHeaderD", "fn ID (Parameters) -> Type")
-            ]
-            for idx, lhs, rhs in grammar_data:
-                tag = 'evenrow' if idx % 2 == 0 else 'oddrow'
-                self.grammar_editor.insert("", tk.END,
-                                           values=(idx, lhs, rhs),
-                                           tags=(tag,))
-
         # 设置交错背景色
-        self.grammar_editor.tag_configure('evenrow', background='#ebf8ff')
-        self.grammar_editor.tag_configure('oddrow', background='#ffffff')
+        _configure_row_tags(self.grammar_editor)
 
         # 添加垂直滚动条
         scrollbar = ttk.Scrollbar(grammar_tab, orient="vertical", command=self.grammar_editor.yview)
@@ -516,6 +638,7 @@ class GrammarVisualizerApp:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.grammar_editor.pack(fill=tk.BOTH, expand=True)
         self.analysis_notebook.add(grammar_tab, text="语法定义")
+        self._tab_builders[str(grammar_tab)] = self._build_grammar_tab
 
         # 绑定事件 - 点击行时高亮显示
         def on_grammar_select(event):
@@ -588,8 +711,7 @@ class GrammarVisualizerApp:
         export_btn.pack(side=tk.BOTTOM, pady=8)
 
         # 设置交错背景色
-        self.ir_table.tag_configure('evenrow', background='#ebf8ff')
-        self.ir_table.tag_configure('oddrow', background='#ffffff')
+        _configure_row_tags(self.ir_table, even_bg='#f0f0ff')
 
         # 目标代码标签页
         target_code_tab = ttk.Frame(self.analysis_notebook)
@@ -635,8 +757,7 @@ class GrammarVisualizerApp:
                 try:
                     with open(file_path, "w", encoding="utf-8") as f:
                         if self.asmcode:
-                            for line in self.asmcode:
-                                f.write(line + "\n")
+                            f.write(self.aim_code_generator.get_asm_text())
                         else:
                             f.write("目标代码尚未生成，请先进行分析。")
                     messagebox.showinfo("导出成功", f"目标代码已导出到：{file_path}")
@@ -652,13 +773,206 @@ class GrammarVisualizerApp:
 
         self.analysis_notebook.add(target_code_tab, text="目标代码")
         
+    # --------------- 标签页延迟构建 -------------------
+
+    def _on_tab_changed(self, event):
+        """标签页切换时，首次选中的标签页才执行其内容填充"""
+        builder = self._tab_builders.pop(event.widget.select(), None)
+        if builder:
+            builder()
+
+    def _insert_rows(self, tree, rows, first=50, chunk=200):
+        """
+            向表格插入行(奇偶行交错标签)
+
+        Args:
+            tree: 目标Treeview
+            rows: 每行的values
+            first: 立即插入的行数(首屏可见部分)
+            chunk: 其余行每次空闲时插入的行数
+
+        Note:
+            首屏之外的行在空闲回调中分批插入，避免一次性插入大量行阻塞界面；
+            同一表格再次调用时，之前尚未完成的分批插入自动作废
+        """
+        insert = tree.insert
+        token = self._row_insert_tokens[str(tree)] = object()
+
+        def insert_from(begin, end):
+            if self._row_insert_tokens.get(str(tree)) is not token:
+                return  # 表格已被重新填充
+            for i in range(begin, min(end, len(rows))):
+                insert("", "end", values=rows[i], tags=(_ROW_TAGS[i & 1],))
+            if end < len(rows):
+                self.root.after_idle(insert_from, end, end + chunk)
+
+        insert_from(0, first)
+
+    def _build_action_tab(self):
+        """填充ACTION表"""
+        # 设置ACTION表列 - 从解析器中获取实际的终结符
+        try:
+            # 获取所有可能的终结符
+            terminals = sorted({k for state in self.parser.action.values() for k in state.keys()})
+
+            # 设置列
+            columns = ["state"] + terminals
+            self.action_table["columns"] = columns
+            self.action_table.column("#0", width=80, anchor="center")  # 状态列
+            self.action_table.heading("#0", text="状态")
+
+            # 添加表头
+            for col in columns:
+                self.action_table.column(col, width=80, anchor="center")
+                self.action_table.heading(col, text=col)
+
+            # 填充数据 - 从解析器中获取实际的ACTION表数据(先一次性构造所有行，再逐行插入)
+            action = self.parser.action
+            rows = [(state, *[action_row.get(term, "") for term in terminals])
+                    for state, action_row in ((state, action[state]) for state in sorted(action))]
+            self._insert_rows(self.action_table, rows)
+
+        except Exception as e:
+            # 如果获取失败，使用示例数据作为后备
+            self.action_table["columns"] = ("state", "id", "plus", "mul", "lparen", "rparen", "$")
+            for col in self.action_table["columns"]:
+                self.action_table.heading(col, text=col)
+                self.action_table.column(col, width=80, anchor='center')
+
+            for i in range(10):
+                self.action_table.insert("", tk.END, values=(
+                    f"s{i}", f"r{i}", "s1", "s2", "s3", "s4", "acc"
+                ), tags=(_ROW_TAGS[i & 1],))
+
+    def _build_goto_tab(self):
+        """填充GOTO表"""
+        # 设置GOTO表列 - 从解析器中获取实际的非终结符
+        try:
+            # 获取所有可能的非终结符
+            non_terminals = sorted({k for state in self.parser.goto_tbl.values() for k in state.keys()})
+
+            # 设置列
+            columns = ["state"] + non_terminals
+            self.goto_table["columns"] = columns
+            self.goto_table.column("#0", width=80, anchor="center")
+            self.goto_table.heading("#0", text="状态")
+
+            # 添加表头
+            for col in columns:
+                self.goto_table.column(col, width=80, anchor="center")
+                self.goto_table.heading(col, text=col)
+
+            # 填充数据 - 从解析器中获取实际的GOTO表数据(先一次性构造所有行，再逐行插入)
+            goto_tbl = self.parser.goto_tbl
+            rows = [(state, *[goto_row.get(nt, "") for nt in non_terminals])
+                    for state, goto_row in ((state, goto_tbl[state]) for state in sorted(goto_tbl))]
+            self._insert_rows(self.goto_table, rows)
+
+        except Exception as e:
+            # 如果获取失败，使用示例数据作为后备
+            self.goto_table["columns"] = ("state", "E", "T", "F")
+            for col in self.goto_table["columns"]:
+                self.goto_table.heading(col, text=col)
+                self.goto_table.column(col, width=80, anchor='center')
+
+            for i in range(10):
+                self.goto_table.insert("", tk.END, values=(
+                    i, i + 1, i + 2, i + 3
+                ), tags=(_ROW_TAGS[i & 1],))
+
+    def _build_cfg_tab(self):
+        """绑定控制流图画布的缩放/拖动事件"""
+        self.cfg_canvas.bind("<MouseWheel>", self.zoom_cfg)
+        self.cfg_canvas.bind("<ButtonPress-1>", self.start_cfg_drag)
+        self.cfg_canvas.bind("<B1-Motion>", self.on_cfg_drag)
+        self.cfg_canvas.bind("<ButtonRelease-1>", self.end_cfg_drag)
+
+    def _build_grammar_tab(self):
+        """填充语法定义表"""
+        # 插入语法产生式(先一次性构造所有行，再分批插入)
+        try:
+            productions = [(lhs, prod['rhs']) for lhs, prods in self.parser.rules.items() for prod in prods]  # productions -> rules
+            rows = [(idx, lhs, ' '.join(rhs) if rhs else 'ε') for idx, (lhs, rhs) in enumerate(productions)]
+            self._insert_rows(self.grammar_editor, rows)
+        except Exception as e:
+            # 如果解析器数据不可用，使用示例数据
+            grammar_data = [
+                (0, "Begin", "Program"),
+                (1, "JFuncStart", "ε"),
+                (2, "Program", "JFuncStart DeclarationString"),
+                (3, "DeclarationStrin", "Declaration DeclarationString"),
+                (4, "DeclarationStrin", "Declaration"),
+                (5, "Declaration", "FunctionDeclaration"),
+                (6, "FunctionDeclara1", "FunctionHeaderDeclaration FunctionExpressionBlock"),
+                (7, "FunctionDeclara1", "FunctionHeaderDeclaration Block"),
+                (8, "FunctionHeaderD", "fn ID (Parameters)"),
+                (9, "FunctionHeaderD", "fn ID ("),
+                (10, "FunctionHeaderD", "fn ID (Parameters) -> Type")
+            ]
+            for idx, lhs, rhs in grammar_data:
+                tag = _ROW_TAGS[idx & 1]
+                self.grammar_editor.insert("", tk.END,
+                                           values=(idx, lhs, rhs),
+                                           tags=(tag,))
+
     def on_cfg_func_change(self, func_name):
         self.render_cfg_to_canvas(func_name)
 
     def render_cfg_to_canvas(self, func_name):
-        """将CFG渲染为图片并显示在cfg_canvas上"""
+        """
+            将CFG以矩形/文本/折线直接绘制在cfg_canvas上
+
+        Note:
+            布局尚未计算时，在后台线程中调用Graphviz，完成后回到主线程再绘制
+        """
         if not self.cfgs or func_name not in self.cfgs:
             return
+        layout = self._cfg_layouts.get(func_name)
+        if layout is None:
+            if func_name not in self._cfg_pending:
+                self._cfg_pending.add(func_name)
+                dot, labels = self._build_cfg_graph(func_name)
+                threading.Thread(target=self._layout_cfg_worker,
+                                 args=(func_name, self.cfgs, dot, labels), daemon=True).start()
+            return
+        nodes, edges = layout
+
+        scale, ox, oy = self.cfg_scale, self.cfg_offset_x, self.cfg_offset_y
+        canvas = self.cfg_canvas
+        canvas.delete("all")
+        font = ('Consolas', max(1, round(10 * scale)))
+        for x1, y1, x2, y2, label in nodes:
+            canvas.create_rectangle(x1 * scale + ox, y1 * scale + oy, x2 * scale + ox, y2 * scale + oy,
+                                    fill='white', outline='black')
+            canvas.create_text((x1 + x2) / 2 * scale + ox, (y1 + y2) / 2 * scale + oy,
+                               text=label, font=font, justify=tk.CENTER, tags=("cfg_text",))
+        for points in edges:
+            coords = [c * scale + o for x, y in points for c, o in ((x, ox), (y, oy))]
+            canvas.create_line(*coords, smooth='raw', arrow=tk.LAST)
+
+    def _layout_cfg_worker(self, func_name, cfgs, dot, labels):
+        """后台线程：计算CFG布局，结果交回主线程安装"""
+        try:
+            layout = self._layout_cfg(dot, labels)
+        except Exception as e:
+            layout = e
+        self.root.after_idle(self._install_cfg_layout, func_name, cfgs, layout)
+
+    def _install_cfg_layout(self, func_name, cfgs, layout):
+        """主线程：保存后台计算的CFG布局，若仍是当前函数则绘制"""
+        if cfgs is not self.cfgs:
+            return  # 分析结果已更新，丢弃过期的布局
+        self._cfg_pending.discard(func_name)
+        if isinstance(layout, Exception):
+            messagebox.showerror("错误", f"生成控制流图时出错: {str(layout)}")
+            return
+        self._cfg_layouts[func_name] = layout
+        if self.cfg_func_var.get() == func_name:
+            self.render_cfg_to_canvas(func_name)
+
+    def _build_cfg_graph(self, func_name):
+        """构建CFG的Graphviz图，返回(图, 节点名 -> 标签)"""
+        from graphviz import Digraph  # 延迟导入，缩短启动时间
         cfg = self.cfgs[func_name]
         dot = Digraph(comment=f'CFG of {func_name}')
         dot.attr('node', shape='box', fontname='Consolas', fontsize='10')
@@ -666,36 +980,56 @@ class GrammarVisualizerApp:
         # 获取块内四元式
         func_blocks = self.aim_code_generator.block_controller.func_blocks.get(func_name, [])
 
+        labels = {}
         for block_idx, block in enumerate(func_blocks):
             label_lines = [f"block{block_idx}:"]
             for idx, quad in block:
                 label_lines.append(f"{idx}: {quad.op}, {quad.arg1}, {quad.arg2}, {quad.result}")
             label = "\n".join(label_lines)
+            labels[str(block_idx)] = label
             dot.node(str(block_idx), label=label)
 
         # 添加边
         for block, succs in cfg.items():
             for succ in succs:
                 dot.edge(str(block), str(succ))
+        return dot, labels
+
+    @staticmethod
+    def _layout_cfg(dot, labels):
+        """
+            调用Graphviz计算CFG布局，返回画布坐标系下的节点与边
+
+        Note:
+            使用json渲染器只取布局坐标，不再生成临时图片；
+            Graphviz的y轴向上，这里按包围盒高度翻转为Tk的y轴向下
+        """
+        layout = json.loads(dot.pipe(format='json'))
+        height = float(layout['bb'].split(',')[3])
+
+        def point(text):
+            x, y = text.split(',')
+            return float(x), height - float(y)
+
+        nodes = []
+        for obj in layout.get('objects', []):
+            x, y = point(obj['pos'])
+            half_w, half_h = float(obj['width']) * 36, float(obj['height']) * 36  # 英寸 -> 点(72/2)
+            nodes.append((x - half_w, y - half_h, x + half_w, y + half_h, labels.get(obj['name'], obj['name'])))
+
+        edges = []
+        for edge in layout.get('edges', []):
+            points, arrow_end = [], None
+            for token in edge['pos'].split():
+                if token.startswith('e,'):
+                    arrow_end = point(token[2:])
+                elif not token.startswith('s,'):
+                    points.append(point(token))
+            if arrow_end:  # 以直线段(控制点与端点重合)连到箭头尖端
+                points += [points[-1], arrow_end, arrow_end]
+            edges.append(points)
+        return nodes, edges
 
-        # 渲染为图片
-        dot.render('temp_cfg', format='png', cleanup=True)
-        from PIL import Image, ImageTk
-        img = Image.open('temp_cfg.png')
-        # 缩放
-        new_width = int(img.width * self.cfg_scale)
-        new_height = int(img.height * self.cfg_scale)
-        img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        self.cfg_img = ImageTk.PhotoImage(img)
-        self.cfg_canvas.delete("all")
-        self.cfg_canvas.create_image(
-            self.cfg_offset_x,
-            self.cfg_offset_y,
-            anchor=tk.NW,
-            image=self.cfg_img,
-            tags=("cfg_image",)
-        )
- 
     def highlight_asm(self):
         """为目标代码区添加高亮"""
         # 清除所有高亮
@@ -710,81 +1044,57 @@ class GrammarVisualizerApp:
         self.asm_text.tag_configure("comment", foreground="#888888")  # 灰色
         self.asm_text.tag_configure("number", foreground="#000000")   # 黑色
 
-        section_pat = re.compile(r"^\s*\.\w+")
-        label_pat = re.compile(r"^\s*[\w\.]+:")
-        reg_pat = re.compile(r"\$[a-zA-Z0-9]+")
-        instr_pat = re.compile(r"\b(?:li|add|sub|mul|div|lw|sw|move|syscall|j|jal|jr|bne|beq|slt|slti|sll|srl|and|or|xor|nor|la|lb|sb|sllv|srlv|srav|mfhi|mflo|nop|sgt|addi|sne|sge|seq|sle)\b")
-        number_pat = re.compile(r"\b\d+\b")
-        comment_pat = re.compile(r"#.*")
-
-        lines = self.asm_text.get("1.0", "end-1c").split('\n')
-        for idx, line in enumerate(lines):
-            # 先高亮注释
-            comment_match = comment_pat.search(line)
-            comment_start = comment_end = None
-            if comment_match:
-                comment_start = comment_match.start()
-                comment_end = comment_match.end()
-                self.asm_text.tag_add("comment", f"{idx+1}.{comment_start}", f"{idx+1}.{comment_end}")
-
-            # 段声明
-            m = section_pat.match(line)
-            if m:
-                self.asm_text.tag_add("section", f"{idx+1}.{m.start()}", f"{idx+1}.{m.end()}")
-
-            # 标号
-            m = label_pat.match(line)
-            if m:
-                self.asm_text.tag_add("label", f"{idx+1}.{m.start()}", f"{idx+1}.{m.end()}")
-
-            # 指令、寄存器、常数：只在注释前高亮
-            highlight_limit = comment_start if comment_start is not None else len(line)
-
-            # 指令
-            for m in instr_pat.finditer(line, 0, highlight_limit):
-                self.asm_text.tag_add("instr", f"{idx+1}.{m.start()}", f"{idx+1}.{m.end()}")
-
-            # 寄存器
-            for m in reg_pat.finditer(line, 0, highlight_limit):
-                self.asm_text.tag_add("register", f"{idx+1}.{m.start()}", f"{idx+1}.{m.end()}")
-
-            # 常数
-            for m in number_pat.finditer(line, 0, highlight_limit):
-                # 避免把寄存器名中的数字也高亮为常数
-                if not reg_pat.match(line[m.start()-2:m.end()]):
-                    self.asm_text.tag_add("number", f"{idx+1}.{m.start()}", f"{idx+1}.{m.end()}")
+        # 对全文单次扫描，按匹配到的分组名添加对应标签(同一标签的区间合并为一次tag_add)
+        # 匹配的绝对偏移通过行首偏移表二分查找换算为Tk的"行.列"位置(token不跨行)
+        text = self.asm_text.get("1.0", "end-1c")
+        line_starts = [0, *(m.end() for m in _NEWLINE_RE.finditer(text))]
+        find_line = bisect.bisect_right
+        ranges = {}  # 标签名 -> [起始位置, 结束位置, ...]
+        for m in _ASM_TOKEN_RE.finditer(text):
+            start, end = m.span()
+            line = find_line(line_starts, start)
+            line_start = line_starts[line - 1]
+            ranges.setdefault(m.lastgroup, []).extend(
+                (f"{line}.{start - line_start}", f"{line}.{end - line_start}"))
+
+        for tag, indices in ranges.items():
+            self.asm_text.tag_add(tag, *indices)
         
     def update_asm_line_numbers(self):
         """更新目标代码区的行号"""
-        code = self.asm_text.get("1.0", "end-1c")
-        lines = code.count('\n') + 1
+        lines = int(self.asm_text.index('end-1c').split('.')[0])
         self.asm_line_numbers.config(state='normal')
         self.asm_line_numbers.delete('1.0', 'end')
-        for i in range(1, lines + 1):
-            self.asm_line_numbers.insert('end', f"{i}\n")
+        self.asm_line_numbers.insert('1.0', '\n'.join(map(str, range(1, lines + 1))) + '\n')
         self.asm_line_numbers.config(state='disabled')
 
     def update_line_numbers(self):
-        """更新行号显示"""
-        # 先更新行号
-        content = self.code_editor.get("1.0", "end-1c")
-        lines = content.count('\n') + 1
+        """
+            更新行号显示
 
-        self.line_numbers.config(state='normal')
-        self.line_numbers.delete('1.0', 'end')
+        Note:
+            只为编辑器中可见的行绘制行号，纵坐标取自dlineinfo，自动换行的行也能对齐
+        """
+        editor, canvas = self.code_editor, self.line_numbers
+        lines = int(editor.index('end-1c').split('.')[0])
 
-        # 动态计算行号宽度
+        # 动态计算行号宽度(位数变化时才调整)
         num_width = len(str(lines)) + 1
-
-        # 添加行号（右对齐）
-        for i in range(1, lines + 1):
-            self.line_numbers.insert('end', f"{i:>{num_width}}\n")
-
-        self.line_numbers.config(state='disabled')
-        self.line_numbers.yview_moveto(self.code_editor.yview()[0])
-
-        # 然后执行代码高亮
-        self.highlighter.highlight()
+        if num_width != self._gutter_digits:
+            self._gutter_digits = num_width
+            canvas.config(width=self.gutter_font.measure('0' * num_width) + 8)
+
+        # 右对齐绘制可见行的行号
+        canvas.delete("all")
+        x = int(canvas.cget('width')) - 4
+        line = int(editor.index("@0,0").split('.')[0])
+        while line <= lines:
+            info = editor.dlineinfo(f"{line}.0")
+            if info is None:
+                break  # 已超出可见区域
+            canvas.create_text(x, info[1], anchor=tk.NE, text=str(line),
+                               font=self.gutter_font, fill='#666666')
+            line += 1
 
     def _validate_input(self):
         """验证输入代码有效性"""
@@ -792,7 +1102,8 @@ class GrammarVisualizerApp:
             messagebox.showwarning("输入错误", "请输入要分析的代码")
             return False
         
-        if not self.code_editor.get("1.0", tk.END).strip():
+        # 由Tk在控件内查找第一个非空白字符，无需复制/strip整个缓冲区
+        if not self.code_editor.search(r"\S", "1.0", stopindex="end", regexp=True):
             messagebox.showwarning("输入错误", "代码内容不能为空")
             return False
         
@@ -809,8 +1120,9 @@ class GrammarVisualizerApp:
                 return
             
             # 记录语法分析过程
+            self.analysis_code = self._get_editor_text().strip()
             ast_root, self.analysis_details = self.parser.parse(
-                code=self.code_editor.get("1.0", tk.END).strip(), 
+                code=self.analysis_code, 
                 checker=self.checker
             )
             errors = self.checker.get_errors()
@@ -831,6 +1143,8 @@ class GrammarVisualizerApp:
             self.asmcode = self.aim_code_generator.code
             
             self.cfgs = self.aim_code_generator.block_controller.func_cfgs
+            self._cfg_layouts.clear()
+            self._cfg_pending.clear()
             if not errors:
                 logger.debug("目标代码生成成功")
                 self.show_asm()
@@ -867,108 +1181,19 @@ class GrammarVisualizerApp:
             #     icon="error"
             # )        
 
-    def record_parsing_process(self, tokens):
-        """记录语法分析的每一步过程"""
-        self.analysis_details = []
-        state_stack = [0]  # 状态栈
-        node_stack = []  # 节点栈
-        idx = 0  # 当前token指针
-        token_stream = list(tokens)
-
-        while True:
-            state = state_stack[-1]
-            current_token = token_stream[idx]
-
-            # 记录当前状态
-            step_info = {
-                "stack": list(state_stack),
-                "node_stack": [str(n) for n in node_stack],
-                "input": [str(t) for t in token_stream[idx:]],
-                "action": "",
-                "production": ""
-            }
-
-            # 查ACTION表
-            action = self.parser.action[state].get(current_token.type.value)
-            if not action:
-                expected = sorted(self.parser.action[state].keys())
-                context = token_stream[max(0, idx - 2):idx + 1]
-                raise SyntaxError(
-                    f"语法错误（第{current_token.line}行, 第{current_token.column}列）\n"
-                    f"意外Token: {current_token}\n"
-                    f"期望: {expected}\n"
-                    f"上下文: {context}"
-                )
-
-            # 执行动作
-            if action[0] == 'shift':
-                step_info["action"] = f"移入: {current_token} -> 状态{action[1]}"
-                # 创建终结符节点
-                new_node = ParseNode(symbol=current_token.type.value, children=None, token=current_token)
-                node_stack.append(new_node)
-                idx += 1
-                # ACTION转移
-                action_state = action[1]
-                state_stack.append(action_state)
-
-            elif action[0] == 'reduce':
-                prod_index = action[1]
-                prod = self.parser.rule_index_map[prod_index]  # 修正此处
-                lhs = prod['lhs']
-                rhs_len = len(prod['rhs'])
-
-                step_info["production"] = f"{lhs} → {' '.join(prod['rhs']) if prod['rhs'] else 'ε'}"
-                step_info["action"] = f"规约: 应用产生式 {prod_index}"
-
-                children = []
-                if rhs_len > 0:
-                    state_stack = state_stack[:-rhs_len]
-                    children = node_stack[-rhs_len:]
-                    node_stack = node_stack[:-rhs_len]
-
-                # 创建非终结符节点
-                new_node = ParseNode(symbol=lhs, children=children)
-                self.checker.on_reduce(node=new_node)
-                node_stack.append(new_node)
-
-                # GOTO转移
-                goto_state = self.parser.goto_tbl[state_stack[-1]].get(lhs)
-                state_stack.append(goto_state)
-
-            elif action[0] == 'accept':
-                step_info["action"] = "接受: 分析完成"
-                self.analysis_details.append(step_info)
-                self.visualize_ast(node_stack[0])
-                self.show_step(0)
-                break
-
-            self.analysis_details.append(step_info)
-
-        errors = self.checker.get_errors()
-        self.show_semantic_errors(errors=errors)
-        self.show_quadruples(self.checker.get_quads())
-
     def show_quadruples(self, quadruples: List[Quadruple]):
         """更新中间代码显示"""
-        # 清空现有内容
-        for item in self.ir_table.get_children():
-            self.ir_table.delete(item)
-
-        # 添加新的四元式
-        for idx, quad in enumerate(quadruples):
-            values = (
-                idx,
-                quad.op,
-                str(quad.arg1) if quad.arg1 is not None else "",
-                str(quad.arg2) if quad.arg2 is not None else "",
-                quad.result
-            )
-            tag = 'evenrow' if idx % 2 == 0 else 'oddrow'
-            self.ir_table.insert("", tk.END, values=values, tags=(tag,))
-
-        # 设置交替行颜色
-        self.ir_table.tag_configure('evenrow', background='#f0f0ff')
-        self.ir_table.tag_configure('oddrow', background='#ffffff')
+        # 清空现有内容(一次调用删除全部行)
+        self.ir_table.delete(*self.ir_table.get_children())
+
+        # 添加新的四元式(先一次性构造所有行，再分批插入)
+        rows = [(idx,
+                 quad.op,
+                 str(quad.arg1) if quad.arg1 is not None else "",
+                 str(quad.arg2) if quad.arg2 is not None else "",
+                 quad.result)
+                for idx, quad in enumerate(quadruples)]
+        self._insert_rows(self.ir_table, rows)
     
     def show_semantic_errors(self, errors):
         """显示语义分析错误"""
@@ -1026,7 +1251,7 @@ class GrammarVisualizerApp:
 
         # 显示输入串
         self.process_text.insert(tk.END, "输入串:\n", "header")
-        input_str = " ".join(step["input"])
+        input_str = self.analysis_code[step["input_pos"]:]
         self.process_text.insert(tk.END, input_str + "\n\n")
 
         # 显示动作
@@ -1045,91 +1270,114 @@ class GrammarVisualizerApp:
         self.process_text.config(state=tk.DISABLED)
         
     def show_ast(self, root):
-        """使用Graphviz可视化AST，支持缩放与拖动"""
+        """
+            使用Graphviz可视化AST，支持缩放与拖动
+
+        Note:
+            主线程只构建图，Graphviz渲染在后台线程中进行，完成后回到主线程显示
+        """
         try:
+            self.ast_tree_root = root
             self.tree_canvas.delete("all")
-            # 创建Graphviz图
+            # 创建Graphviz图(延迟导入，缩短启动时间)
+            from graphviz import Digraph
             dot = Digraph(comment='AST')
-            dot.attr('node', shape='box', style='rounded')
-            dot.attr('edge', arrowhead='vee')
-
-            def add_nodes_edges(node, parent_id=None):
+            dot.attr('node', shape='box', style='filled,rounded', fontname='Arial', penwidth='1.5')
+            dot.attr('edge', arrowhead='vee', color='#6c757d', penwidth='1.2')
+
+            # 公共属性已放入默认node/edge属性，逐节点直接拼接DOT行，避免Digraph.node/edge的逐次格式化开销
+            term_attr = 'fillcolor="#d4edda" color="#155724" fontcolor="#155724"'
+            nonterm_attr = 'fillcolor="#d1ecf1" color="#0c5460" fontcolor="#0c5460"'
+            epsilon_attr = 'label="ε" fillcolor="#f8d7da" color="#721c24" fontcolor="#721c24"'
+            lines = []
+            append = lines.append
+            stack = [(root, None)]      # 显式栈代替递归，避免深层AST触及递归上限
+            pop, push = stack.pop, stack.append
+            while stack:
+                node, parent_id = pop()
                 node_id = str(id(node))
-                if node.is_terminal():
-                    label = f"{node.symbol}\n{node.token.value}"
-                    fill_color = "#d4edda"
-                    border_color = "#155724"
-                    font_color = "#155724"
+                if node.token is not None:
+                    label = f"{node.symbol}\n{node.token.value}".replace('"', '\\"')
+                    append(f'\t{node_id} [label="{label}" {term_attr}]\n')
                 else:
-                    label = node.symbol
-                    fill_color = "#d1ecf1"
-                    border_color = "#0c5460"
-                    font_color = "#0c5460"
+                    label = node.symbol.replace('"', '\\"')
+                    append(f'\t{node_id} [label="{label}" {nonterm_attr}]\n')
                     if not node.children:
-                        epsilon_id = f"{node_id}_epsilon"
-                        dot.node(
-                            epsilon_id,
-                            label="ε",
-                            fillcolor="#f8d7da",
-                            style='filled,rounded',
-                            color="#721c24",
-                            fontcolor="#721c24",
-                            fontname="Arial",
-                            penwidth="1.5"
-                        )
-                        dot.edge(node_id, epsilon_id, color="#6c757d", penwidth="1.2")
-                dot.node(
-                    node_id,
-                    label=label,
-                    fillcolor=fill_color,
-                    style='filled,rounded',
-                    color=border_color,
-                    fontcolor=font_color,
-                    fontname="Arial",
-                    penwidth="1.5"
-                )
+                        append(f'\t"{node_id}_epsilon" [{epsilon_attr}]\n')
+                        append(f'\t{node_id} -> "{node_id}_epsilon"\n')
                 if parent_id is not None:
-                    dot.edge(parent_id, node_id, color="#6c757d", penwidth="1.2")
-                for child in node.children:
-                    add_nodes_edges(child, node_id)
-
-            add_nodes_edges(root)
+                    append(f'\t{parent_id} -> {node_id}\n')
+                # 逆序压栈，保持与递归版本相同的先序输出顺序
+                for child in reversed(node.children):
+                    push((child, node_id))
+            dot.body.extend(lines)
             dot.attr(rankdir='TB', margin='0.2', nodesep='0.2', ranksep='0.5')
-            dot.render('temp_ast', format='png', cleanup=True)
+            threading.Thread(target=self._render_ast_worker, args=(root, dot), daemon=True).start()
 
-            from PIL import Image, ImageTk
-            img = Image.open("temp_ast.png")
-
-            # 缩放
-            new_width = int(img.width * self.tree_scale)
-            new_height = int(img.height * self.tree_scale)
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        except Exception as e:
+            messagebox.showerror("错误", f"可视化AST时出错: {str(e)}")
 
-            self.ast_img = ImageTk.PhotoImage(img)
-            self.tree_canvas.delete("all")
-            self.tree_image_id = self.tree_canvas.create_image(
-                self.tree_offset_x,
-                self.tree_offset_y,
-                anchor=tk.NW,
-                image=self.ast_img,
-                tags=("ast_image",)
-            )
+    def _render_ast_worker(self, root, dot):
+        """后台线程：渲染AST图片到内存并解码，结果交回主线程显示"""
+        try:
+            img = Image.open(io.BytesIO(dot.pipe(format='png')))
+            img.load()
+        except Exception as e:
+            img = e
+        self.root.after(0, self._install_ast_image, root, img)
+
+    def _install_ast_image(self, root, img):
+        """主线程：显示后台渲染的AST图片(缩放时复用同一份原图)"""
+        if root is not self.ast_tree_root:
+            return  # 已重新分析或重置，丢弃过期的图片
+        if isinstance(img, Exception):
+            messagebox.showerror("错误", f"可视化AST时出错: {str(img)}")
+            return
+        self._ast_src_img = img
+        self._ast_imgtk_cache.clear()
 
-            # 绑定鼠标悬停事件
-            self.tree_canvas.tag_bind("ast_image", "<Enter>", lambda e: self.tree_canvas.config(cursor="hand2"))
-            self.tree_canvas.tag_bind("ast_image", "<Leave>", lambda e: self.tree_canvas.config(cursor=""))
+        self.ast_img = self._ast_photo()
+        self.tree_canvas.delete("all")
+        self.tree_image_id = self.tree_canvas.create_image(
+            self.tree_offset_x,
+            self.tree_offset_y,
+            anchor=tk.NW,
+            image=self.ast_img,
+            tags=("ast_image",)
+        )
 
-        except Exception as e:
-            messagebox.showerror("错误", f"可视化AST时出错: {str(e)}")
+        # 绑定鼠标悬停事件
+        self.tree_canvas.tag_bind("ast_image", "<Enter>", lambda e: self.tree_canvas.config(cursor="hand2"))
+        self.tree_canvas.tag_bind("ast_image", "<Leave>", lambda e: self.tree_canvas.config(cursor=""))
             
+    def _ast_photo(self, fast=False):
+        """
+            获取当前缩放比例下的AST图片
+
+        Args:
+            fast: 交互缩放过程中为True，缓存未命中时用BILINEAR快速缩放(结果不缓存)
+
+        Note:
+            缩放比例按0.1分档作为缓存键，同一档位只做一次LANCZOS缩放
+        """
+        key = max(1, round(self.tree_scale * 10))
+        photo = self._ast_imgtk_cache.get(key)
+        if photo is None:
+            img = self._ast_src_img
+            img = img.resize((max(1, img.width * key // 10), max(1, img.height * key // 10)),
+                             Image.Resampling.BILINEAR if fast else Image.Resampling.LANCZOS)
+            photo = ImageTk.PhotoImage(img)
+            if not fast:
+                self._ast_imgtk_cache[key] = photo
+        return photo
+
     def show_asm(self):
     # 切换到目标代码tab，并显示目标代码
         self.analysis_notebook.select(self.analysis_notebook.index("end") - 1)  # 切换到目标代码标签页
         self.asm_text.config(state='normal')
         self.asm_text.delete(1.0, tk.END)
         if self.asmcode:
-            for line in self.asmcode:
-                self.asm_text.insert(tk.END, line + "\n")
+            self.asm_text.insert(tk.END, self.aim_code_generator.get_asm_text())
         else:
             self.asm_text.insert(tk.END, "目标代码尚未生成，请先进行分析。")
         self.asm_text.config(state='disabled')
@@ -1219,6 +1467,10 @@ class GrammarVisualizerApp:
         self.drag_data = {"x": 0, "y": 0, "item": None}
         self.asmcode = None
         self.cfgs = None
+        self._cfg_layouts.clear()
+        self._cfg_pending.clear()
+        self._ast_src_img = None
+        self._ast_imgtk_cache.clear()
 
         self.process_text.config(state=tk.NORMAL)
         self.process_text.delete(1.0, tk.END)
@@ -1240,8 +1492,10 @@ class GrammarVisualizerApp:
         """在单独的线程中启动解析器初始化"""
 
         def parsing_thread():
-            # 执行耗时操作 -- 构建分析表
-            self.parser.build_table(RUST_GRAMMAR_PPT)
+            # 执行耗时操作 -- 创建分析器并构建分析表(文法未变化时直接读取磁盘缓存)
+            self.parser = Parser()
+            self.checker = SemanticChecker()
+            self.parser.build_table(RUST_GRAMMAR_PPT, cache_dir=TABLE_CACHE_DIR)
 
             # 完成后，在主线程中销毁加载界面并创建主界面
             self.root.after(0, self.finish_loading)
@@ -1393,14 +1647,27 @@ class GrammarVisualizerApp:
         """缩放语法树"""
         scale_factor = 1.1 if event.delta > 0 else 0.9
         self.tree_scale *= scale_factor
-        # 重新绘制树
-        if hasattr(self, 'ast_img'):
-            from PIL import Image
-            img = Image.open("temp_ast.png")
-            new_width = int(img.width * self.tree_scale)
-            new_height = int(img.height * self.tree_scale)
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            self.ast_img = ImageTk.PhotoImage(img)
+        # 合并连续的滚轮事件，每帧(约16ms)最多重绘一次
+        if self._zoom_after_id is None:
+            self._zoom_after_id = self.root.after(16, self._apply_tree_zoom)
+
+    def _apply_tree_zoom(self):
+        """按累计后的缩放比例重新绘制语法树(缩放过程中使用快速缩放，停止200ms后再精细重绘)"""
+        self._zoom_after_id = None
+        if self._zoom_settle_id is not None:
+            self.root.after_cancel(self._zoom_settle_id)
+        self._zoom_settle_id = self.root.after(200, self._settle_tree_zoom)
+        self._redraw_ast(fast=True)
+
+    def _settle_tree_zoom(self):
+        """缩放结束后用LANCZOS重新绘制语法树"""
+        self._zoom_settle_id = None
+        self._redraw_ast()
+
+    def _redraw_ast(self, fast=False):
+        """按当前缩放比例重新绘制语法树图片"""
+        if self._ast_src_img:
+            self.ast_img = self._ast_photo(fast)
             self.tree_canvas.delete("all")
             self.tree_canvas.create_image(
                 self.tree_offset_x,
@@ -1425,16 +1692,8 @@ class GrammarVisualizerApp:
         self.cfg_offset_y += dy
         self.cfg_drag_data["x"] = event.x
         self.cfg_drag_data["y"] = event.y
-        # 重新绘制
-        if hasattr(self, 'cfg_img'):
-            self.cfg_canvas.delete("all")
-            self.cfg_canvas.create_image(
-                self.cfg_offset_x,
-                self.cfg_offset_y,
-                anchor=tk.NW,
-                image=self.cfg_img,
-                tags=("cfg_image",)
-            )
+        # 平移已绘制的图元即可，无需重新绘制
+        self.cfg_canvas.move("all", dx, dy)
 
     def end_cfg_drag(self, event):
         """结束拖动CFG图"""
@@ -1444,8 +1703,12 @@ class GrammarVisualizerApp:
         """缩放CFG图"""
         scale_factor = 1.1 if event.delta > 0 else 0.9
         self.cfg_scale *= scale_factor
-        # 重新绘制CFG
-        self.render_cfg_to_canvas(self.cfg_func_var.get())
+        # 以鼠标位置为中心做坐标变换，同步偏移量以便之后重绘时位置一致
+        self.cfg_offset_x = event.x + (self.cfg_offset_x - event.x) * scale_factor
+        self.cfg_offset_y = event.y + (self.cfg_offset_y - event.y) * scale_factor
+        self.cfg_canvas.scale("all", event.x, event.y, scale_factor, scale_factor)
+        # 文本字号不随scale变化，单独调整
+        self.cfg_canvas.itemconfigure("cfg_text", font=('Consolas', max(1, round(10 * self.cfg_scale))))
         
     # ---------------- 按键事件 -------------------
 
@@ -1467,6 +1730,7 @@ class GrammarVisualizerApp:
             self.code_editor.config(state='normal')
             self.code_editor.delete('1.0', tk.END)
             self.code_editor.insert(tk.END, content)
+            self._invalidate_editor_text()
             self.code_editor.config(state='normal')
             self.code_editor.tag_remove("placeholder", "1.0", "end")
             self.code_editor.config(foreground='black')
@@ -3,6 +3,16 @@ from compiler_rust_grammar import *
 from compiler_codegenerator import Quadruple
 from compiler_logger import logger
 from typing import Dict
+from collections import deque, OrderedDict
+import heapq
+import bisect
+
+_JUMP_OPS = frozenset({'j', 'jnz'})  # 结束基本块的跳转指令
+
+# 函数级分析结果缓存(LRU) {分析键: (各块长度, 各块后继, in_sets, out_sets)}
+# 只保存与四元式对象无关的不可变结果，命中时按当前四元式重新切分基本块
+_ANALYSIS_CACHE: OrderedDict = OrderedDict()
+_ANALYSIS_CACHE_SIZE = 64
 
 class BlockController:
     """控制基本块划分和分析"""
@@ -17,22 +27,30 @@ class BlockController:
 
     def _initialize_analysis(self):
         """初始化分析结果"""
-        self.func_entries: Dict[str, int] = self._get_function_entry()
-        self.func_vars: Dict[str, set] = self._get_function_vars()
+        self.func_entries: Dict[str, int] = self._scan_functions()
+        self.func_vars: Dict[str, set[str]] = {}  # 由_scan_quads在遍历四元式时填充
+
+        # 按入口索引排序的函数名及对应入口索引(供划分函数与get_scope_by_index使用)
+        sorted_entries = sorted(self.func_entries.items(), key=lambda x: x[1])
+        self._sorted_entry_names = [name for name, _ in sorted_entries]
+        self._sorted_entry_idxs = [idx for _, idx in sorted_entries]
+
         self.func_blocks: Dict[str, list] = self._split_all_functions()
 
-        self.func_cfgs: Dict[str, Dict[int, list[int]]] = {
-            f_name: self._build_cfg(blocks) 
+        # 四元式在构造后不再变化，块编号索引只需构建一次
+        self._quad_to_block: Dict[str, Dict[int, int]] = {               # {函数名: {四元式索引: 基本块编号}}
+            f_name: {idx: block_idx for block_idx, block in enumerate(blocks) for idx, _ in block}
             for f_name, blocks in self.func_blocks.items()
         }
 
-        self.live_vars: Dict[str, tuple[list[set[str]], list[set[str]]]] = {
-            f_name: self._live_variable_analysis(
-                blocks, 
-                self.func_cfgs[f_name], 
-                self.func_vars[f_name]
-            )
-            for f_name, blocks in self.func_blocks.items()
+        self.func_cfgs: Dict[str, Dict[int, list[int]]] = {
+            f_name: self._func_analysis[f_name][1]
+            for f_name in self.func_blocks
+        }
+
+        self.live_vars: Dict[str, tuple[list[frozenset[str]], list[frozenset[str]]]] = {
+            f_name: self._func_analysis[f_name][2]
+            for f_name in self.func_blocks
         }
         
     
@@ -49,30 +67,20 @@ class BlockController:
         根据四元式索引获取对应的函数作用域名和所属的基本块编号
         返回: (函数名, 基本块编号)；如果找不到，返回 (None, None)
         """
-        # 先确定属于哪个函数
-        if not self.func_entries:
+        # 二分查找入口索引确定所属函数，再查表得到基本块编号
+        i = bisect.bisect_right(self._sorted_entry_idxs, index) - 1
+        if i < 0:
             return (None, None)
-        sorted_entries = sorted(self.func_entries.items(), key=lambda x: x[1])
-        func_name = None
-        for i, (fname, start_idx) in enumerate(sorted_entries):
-            end_idx = sorted_entries[i + 1][1] if i + 1 < len(sorted_entries) else float('inf')
-            if start_idx <= index < end_idx:
-                func_name = fname
-                break
-        if func_name is None:
-            return (None, None)
-        # 再确定属于该函数的哪个基本块
-        blocks = self.func_blocks[func_name]
-        for block_idx, block in enumerate(blocks):
-            quad_indices = [idx for idx, _ in block]
-            if index in quad_indices:
-                return (func_name, block_idx)
-        return (func_name, None)
-
-    def _get_function_entry(self) -> Dict[str, int]:
-        """获取每个函数入口的四元式索引"""
-        # 遍历全局符号表，找到所有函数符号
-        # 返回一个字典 {func_name: entry_index}
+        func_name = self._sorted_entry_names[i]
+        return (func_name, self._quad_to_block[func_name].get(index))
+
+    def _scan_functions(self) -> Dict[str, int]:
+        """
+            单次遍历全局符号表，获取每个函数入口的四元式索引
+
+        Returns:
+            func_entries: {func_name: entry_index}
+        """
         logger.debug("获取函数入口四元式索引...")
 
         return {
@@ -81,24 +89,88 @@ class BlockController:
             if isinstance(symbol, FunctionSymbol) and symbol.quad_index is not None
         }
 
-    def _get_function_vars(self) -> Dict[str, set]:
-        """获取每个函数作用域下的变量名集合"""
-        # 遍历函数入口，收集每个函数作用域内的有效变量名
-        # 即只收集函数作用域内的变量名，不包括全局变量
-        # 返回一个字典 {func_name: {var_name1, var_name2, ...}}
-        logger.debug("收集函数作用域内的有效变量名...")
-
-        def collect_vars(scope) -> set[str]:
-            """辅助函数--收集单个作用域内的有效变量名"""
-            return {
-                sym.name for sym in scope.symbols.values()
-                if isinstance(sym, (VariableSymbol, ParameterSymbol))
-            }
-        
-        return {
-            func_name: collect_vars(self.symbolTable.find_scope(func_name))
-            for func_name in self.func_entries.keys()
-        }
+    def _scan_quads(self) -> tuple[Dict[str, tuple[int, int]], Dict[str, list[str]]]:
+        """
+            单次遍历四元式，按入口索引划分各函数的四元式区间，收集调用边与各函数的变量
+
+        Note:
+            函数的变量为其四元式中出现的所有变量名(包括临时变量和嵌套作用域中的变量)，
+            不包括返回寄存器$ret_reg和函数名，结果存入self.func_vars，与目标代码生成使用的变量一致
+
+        Returns:
+            (func_ranges, callees):
+            - func_ranges: {函数名: (起始位置, 结束位置)}，为self.quads中的切片区间
+            - callees: {调用者: [被调用者, ...]}，按首次调用顺序，忽略自递归与重复调用
+        """
+        entry_names = dict(zip(self._sorted_entry_idxs, self._sorted_entry_names))  # 入口索引 -> 函数名
+        func_ranges = {}
+        callees = {f: [] for f in self.func_entries}
+        excluded = {'$ret_reg', *self.func_entries}  # 不参与活跃变量分析的名字
+        cur_func, start_pos, seen, func_vars = None, 0, set(), set()
+        for pos, (idx, quad) in enumerate(self.quads):
+            if idx in entry_names:
+                # 到达下一个函数的入口，结束当前函数的区间
+                if cur_func is not None:
+                    func_ranges[cur_func] = (start_pos, pos)
+                cur_func, start_pos = entry_names[idx], pos
+                seen = {cur_func}
+                func_vars = self.func_vars[cur_func] = set()
+            if cur_func is None:
+                continue
+            if quad.op == 'call' and (callee := quad.arg1) in callees and callee not in seen:
+                seen.add(callee)
+                callees[cur_func].append(callee)
+            for operand in (quad.arg1, quad.arg2, quad.result):
+                if type(operand) is str and operand and operand not in excluded:
+                    func_vars.add(operand)
+        if cur_func is not None:
+            func_ranges[cur_func] = (start_pos, len(self.quads))
+        return func_ranges, callees
+
+    def _analyze_function(self, quads: list[tuple[int, Quadruple]], valid_vars: set[str]) -> tuple:
+        """
+            对单个函数做基本块划分、CFG构建与活跃变量分析
+
+        Note:
+            结果缓存在模块级LRU中，重复分析未改动的函数(如再次分析同一份代码)时直接复用；
+            分析键只包含影响结果的字段: 四元式索引、操作符、字符串操作数(变量名)及结果与其类型，
+            命中时返回由当前四元式切分出的新基本块列表和新的CFG，调用方可自由修改
+
+        Returns:
+            (blocks, cfg, (in_sets, out_sets))
+        """
+        key = (
+            tuple(
+                (idx, quad.op,
+                 arg1 if type(arg1 := quad.arg1) is str else None,
+                 arg2 if type(arg2 := quad.arg2) is str else None,
+                 result := quad.result, type(result))
+                for idx, quad in quads
+            ),
+            frozenset(valid_vars),
+        )
+        cached = _ANALYSIS_CACHE.get(key)
+        if cached is not None:
+            _ANALYSIS_CACHE.move_to_end(key)
+            block_lens, succs, in_sets, out_sets = cached
+            blocks, start = [], 0
+            for length in block_lens:
+                blocks.append(quads[start:start + length])
+                start += length
+            return blocks, {i: list(succ) for i, succ in enumerate(succs)}, (list(in_sets), list(out_sets))
+
+        blocks = self._block_split(quads)
+        cfg = self._build_cfg(blocks)
+        in_sets, out_sets = self._live_variable_analysis(blocks, cfg, valid_vars)
+
+        _ANALYSIS_CACHE[key] = (
+            tuple(len(block) for block in blocks),
+            tuple(tuple(cfg[i]) for i in range(len(blocks))),
+            tuple(in_sets), tuple(out_sets),
+        )
+        if len(_ANALYSIS_CACHE) > _ANALYSIS_CACHE_SIZE:
+            _ANALYSIS_CACHE.popitem(last=False)
+        return blocks, cfg, (in_sets, out_sets)
 
     def _block_split(self, quads: list[tuple[int, Quadruple]]) -> list[list[tuple[int, Quadruple]]]:
         """
@@ -123,21 +195,29 @@ class BlockController:
         if not quads:
             return []
 
-        # 创建指令索引到位置的映射
-        index_to_pos = {inst_idx: pos for pos, (inst_idx, _) in enumerate(quads)}
-
-        # 识别所有基本块起始位置
+        n = len(quads)
+        base = quads[0][0]
+        # 函数内四元式索引通常连续，此时跳转目标的位置可直接由索引差得到，无需构建索引到位置的映射
+        if quads[-1][0] - base == n - 1:
+            target_pos = lambda target: target - base if type(target) is int and 0 <= target - base < n else None
+        else:
+            index_to_pos = {inst_idx: pos for pos, (inst_idx, _) in enumerate(quads)}
+            target_pos = index_to_pos.get
+
+        # 识别所有基本块起始位置: 先一次性找出跳转指令的位置，再只处理这些位置
+        jump_positions = [
+            pos for pos, (_, quad) in enumerate(quads)
+            if quad.op in _JUMP_OPS and quad.result is not None
+        ]
         block_starts = {0}  # 第一条指令总是块起始
-
-        for current_pos, (_, quad) in enumerate(quads):
-            # 处理跳转指令
-            if quad.op in {'j', 'jnz'} and quad.result is not None:
-                # 添加跳转目标位置
-                if quad.result in index_to_pos:
-                    block_starts.add(index_to_pos[quad.result])
-                # 添加跳转指令的后继位置
-                if current_pos + 1 < len(quads):
-                    block_starts.add(current_pos + 1)
+        for current_pos in jump_positions:
+            # 添加跳转目标位置
+            pos = target_pos(quads[current_pos][1].result)
+            if pos is not None:
+                block_starts.add(pos)
+            # 添加跳转指令的后继位置
+            if current_pos + 1 < n:
+                block_starts.add(current_pos + 1)
 
         # 按位置排序并划分基本块
         sorted_starts = sorted(block_starts)
@@ -145,7 +225,7 @@ class BlockController:
             quads[start:end]
             for start, end in zip(
                 sorted_starts,
-                sorted_starts[1:] + [len(quads)]
+                sorted_starts[1:] + [n]
             )
         ]
 
@@ -159,46 +239,45 @@ class BlockController:
         logger.debug("划分所有函数的基本块并根据调用关系排序...")
 
         func_blocks = {} # {函数名: 基本块列表}
+        self._func_analysis = {}  # {函数名: (基本块列表, CFG, (in_sets, out_sets))}
 
-        # 预构建索引到位置的映射
-        index_map = {idx: i for i, (idx, _) in enumerate(self.quads)}
-
-        # 将函数入口字典转换为按照quad_index排序的列表
-        sorted_entries = sorted(
-            self.func_entries.items(), # (func_name, start_idx)
-            key=lambda x: x[1]         # 按入口索引排序
-        )
-
-        # 遍历每个函数入口，划分基本块
-        for i, (func_name, start_idx) in enumerate(sorted_entries):
-            start_pos = index_map[start_idx]
-            end_pos = index_map[sorted_entries[i+1][1]] if i+1 < len(sorted_entries) else len(self.quads)
+        # 单次遍历四元式得到各函数的区间与调用图 (调用者 -> 被调用者列表)
+        func_ranges, callees = self._scan_quads()
 
-            # 划分当前函数的基本块
+        # 遍历每个函数区间，划分基本块(同时完成CFG构建与活跃变量分析)
+        for func_name, (start_pos, end_pos) in func_ranges.items():
             logger.debug(f"划分函数 {func_name} 的基本块: {start_pos} - {end_pos}")
-            func_blocks[func_name] = self._block_split(self.quads[start_pos:end_pos])
-
-        # 根据调用关系对函数进行拓扑排序
-        # 构建调用图 (被调用者 -> 调用者集合)
-        call_graph = {}
-        for caller, blocks in func_blocks.items():
-            for _, quad in (item for block in blocks for item in block):
-                if getattr(quad, 'op', None) == 'call' and (callee := getattr(quad, 'arg1', None)) in func_blocks:
-                    call_graph.setdefault(callee, set()).add(caller)
-
-        # 拓扑排序
-        order, visited = [], set()
-        def visit(f):
-            """深度优先访问函数，确保调用者在前"""
-            if f not in visited:
-                visited.add(f)
-                for caller in call_graph.get(f, set()):
-                    visit(caller)
-                order.append(f)
-
-        # 先访问 main 函数，确保它在最前面
-        visit('main') if 'main' in func_blocks else None
-        [visit(f) for f in func_blocks if f not in visited]
+            analysis = self._analyze_function(self.quads[start_pos:end_pos], self.func_vars[func_name])
+            self._func_analysis[func_name] = analysis
+            func_blocks[func_name] = analysis[0]
+
+        # 各函数的入度(不同调用者的数量)
+        in_degree = dict.fromkeys(callees, 0)
+        for called in callees.values():
+            for callee in called:
+                in_degree[callee] += 1
+
+        # 根据调用关系对函数进行拓扑排序(Kahn算法，调用者在前)
+
+        # 入度为0的函数入队，main 函数排在最前面
+        roots = [f for f in func_blocks if in_degree[f] == 0]
+        roots.sort(key=lambda f: f != 'main')
+        queue = deque(roots)
+        order, placed = [], set()
+        remaining = iter(func_blocks)
+        while len(order) < len(func_blocks):
+            if not queue:
+                # 剩余函数之间存在相互递归，按入口顺序取第一个未排序的函数打破环
+                queue.append(next(f for f in remaining if f not in placed))
+            f = queue.popleft()
+            if f in placed:
+                continue
+            placed.add(f)
+            order.append(f)
+            for callee in callees[f]:
+                in_degree[callee] -= 1
+                if in_degree[callee] == 0:
+                    queue.append(callee)
 
         return {f: func_blocks[f] for f in order}
 
@@ -214,107 +293,169 @@ class BlockController:
         """
         logger.debug("构建控制流图(CFG)...")
 
-        # 构建指令索引到块索引的映射
-        idx_to_block = {
-            idx: b_idx 
-            for b_idx, block in enumerate(blocks) 
-            for idx, _ in block
-        }
+        # 构建块首指令索引到块索引的映射
+        # _block_split保证函数内的跳转目标都是块首指令，只需映射每块的第一条指令
+        idx_to_block = {block[0][0]: b_idx for b_idx, block in enumerate(blocks)}
 
         cfg = {} # {块索引: 后继块索引列表}
         for i, block in enumerate(blocks):
             successors = set()        # 存储后继块索引
             last_quad = block[-1][1]  # 取最后一条指令
 
-            # 处理跳转指令
-            if last_quad.op == 'j' and last_quad.result is not None:
-                if last_quad.result in idx_to_block:
-                    successors.add(idx_to_block[last_quad.result])
-            elif last_quad.op == 'jnz' and last_quad.result is not None:
+            # 处理跳转指令(条件跳转jnz还可顺序执行到下一块)
+            if last_quad.op in _JUMP_OPS and last_quad.result is not None:
                 if last_quad.result in idx_to_block:
                     successors.add(idx_to_block[last_quad.result])
-                if i + 1 < len(blocks):
+                if last_quad.op == 'jnz' and i + 1 < len(blocks):
                     successors.add(i + 1)
             
             # 默认顺序执行
             if not successors and i + 1 < len(blocks):
                 successors.add(i + 1)
 
-            cfg[i] = list(successors)
+            cfg[i] = sorted(successors)  # 后继已去重，排序保证顺序确定
 
         return cfg
 
+    @staticmethod
+    def _postorder_rank(succ_lists: list[list[int]]) -> list[int]:
+        """
+            计算各块在正向CFG后序(即反向CFG的逆后序)中的位置
+
+        Note:
+            从入口块0出发做显式栈DFS，避免递归深度限制；
+            入口不可达的块按编号逆序排在最后
+        """
+        n = len(succ_lists)
+        rank = [-1] * n
+        order = 0
+        visited = bytearray(n)
+        for root in [0, *reversed(range(n))] if n else []:
+            if visited[root]:
+                continue
+            visited[root] = 1
+            stack = [(root, iter(succ_lists[root]))]
+            while stack:
+                node, succs = stack[-1]
+                for succ in succs:
+                    if not visited[succ]:
+                        visited[succ] = 1
+                        stack.append((succ, iter(succ_lists[succ])))
+                        break
+                else:
+                    stack.pop()
+                    rank[node] = order
+                    order += 1
+        return rank
+
     def _live_variable_analysis(
             self, 
             blocks: list[list[tuple[int, Quadruple]]], 
             cfg: dict[int, list[int]], 
             valid_vars: set[str]
-        ) -> tuple[list[set[str]], list[set[str]]]:
+        ) -> tuple[list[frozenset[str]], list[frozenset[str]]]:
         """
             活跃变量分析(只统计valid_vars中的变量)
 
         Args:
             blocks: 基本块列表，每个块包含(index, quad)元组
             cfg: 控制流图 {块索引: [后继块索引]}
-            valid_vars: 当前函数作用域下的有效变量集合
+            valid_vars: 当前函数的变量集合(四元式中出现的变量名)
         
         Returns:
             (in_sets, out_sets): 
             - in_sets: 各块入口的活跃变量集合列表
             - out_sets: 各块出口的活跃变量集合列表
+            相同的集合共享同一个frozenset对象，调用方只读不改
         """
         # 初始化每个块的使用和定义集合
         # use[i] = {使用的变量}, defs[i] = {定义的变量}
         # 使用集合包含该块内所有使用的变量，定义集合包含该块内所有定义的变量
         # 只统计有效变量 valid_vars 中的变量
+        # 集合以整数位掩码表示(每个变量占一位)，并/差/比较均为单次整数运算
         logger.debug("进行活跃变量分析...")
-        
-        used_vars = []    # 每个块使用的变量集合
-        defined_vars = [] # 每个块定义的变量集合
+
+        var_names = sorted(valid_vars)                                  # 位序号 -> 变量名
+        var_bits = {name: 1 << k for k, name in enumerate(var_names)}   # 变量名 -> 位掩码
+
+        used_vars = []    # 每个块使用的变量掩码
+        defined_vars = [] # 每个块定义的变量掩码
+        bit_of = var_bits.get
 
         for block in blocks:
-            read_vars = set()     # 记录使用的变量(读取)
-            written_vars = set()  # 记录定义的变量(写入)
+            read_vars = 0     # 记录使用的变量(读取)
+            written_vars = 0  # 记录定义的变量(写入)
 
-            # 遍历块内的四元式
+            # 遍历块内的四元式(Quadruple字段固定，直接访问属性)
             for _, quad in block:  
-                # 检查四元式的操作数                
-                for operand in [getattr(quad, 'arg1', None), getattr(quad, 'arg2', None)]:
-                    if (operand and isinstance(operand, str) and
-                        operand in valid_vars and operand not in written_vars):
-                        read_vars.add(operand)
+                # 检查四元式的操作数(非字符串操作数为常量，不是变量)
+                arg1, arg2, result = quad.arg1, quad.arg2, quad.result
+                if type(arg1) is str:
+                    read_vars |= bit_of(arg1, 0) & ~written_vars
+                if type(arg2) is str:
+                    read_vars |= bit_of(arg2, 0) & ~written_vars
 
                 # 检查四元式的结果
-                if (getattr(quad, 'result', None) and isinstance(quad.result, str) and
-                    quad.result in valid_vars):
-                    written_vars.add(quad.result)
+                if type(result) is str:
+                    written_vars |= bit_of(result, 0)
 
             used_vars.append(read_vars)
             defined_vars.append(written_vars)
         
-        # 初始化IN/OUT集合(每个基本块对应一个集合)
-        in_sets = [set() for _ in blocks]   # IN集合
-        out_sets = [set() for _ in blocks]  # OUT集合
-        changed = True
-
-        while changed:
-            changed = False
-
-            # 反向遍历基本块，更新IN/OUT集合
-            # 反向遍历是因为OUT集合依赖于后继块的IN
-            for i in reversed(range(len(blocks))):
-                # 记录当前块的IN/OUT集合，以便后续比较
-                old_in, old_out = in_sets[i].copy(), out_sets[i].copy()
-
-                # 计算OUT集合: 当前块的后继块的IN集合的并集
-                out_sets[i] = set().union(*(in_sets[succ] for succ in cfg[i]))
-
-                # 计算IN集合: 当前块的使用变量 ∪ (OUT集合 - 定义变量)
-                in_sets[i] = used_vars[i] | (out_sets[i] - defined_vars[i])
-
-                # 检查是否有变化
-                # 如果IN或OUT集合有变化，则标记为需要重新计算
-                if old_in != in_sets[i] or old_out != out_sets[i]:
-                    changed = True
-
+        # 初始化IN/OUT集合(每个基本块对应一个掩码)
+        in_sets = [0] * len(blocks)   # IN集合
+        out_sets = [0] * len(blocks)  # OUT集合
+
+        # 控制流图转为按块编号索引的后继/前驱列表(前驱表: IN集合变化时只需重新计算其前驱块)
+        succ_lists = [cfg[i] for i in range(len(blocks))]
+        preds = [[] for _ in blocks]
+        for i, succs in enumerate(succ_lists):
+            for succ in succs:
+                preds[succ].append(i)
+        keep_masks = [~defs for defs in defined_vars]  # 预先取反的定义掩码，OUT & keep 即 OUT - 定义变量
+
+        # 工作表算法: 按正向CFG的后序处理块(后继先于前驱，反向数据流问题通常两遍即收敛)
+        # 用优先队列按后序位置出队，重新入队的块也保持该顺序
+        rank = self._postorder_rank(succ_lists)
+        worklist = [(rank[i], i) for i in range(len(blocks))]
+        heapq.heapify(worklist)
+        in_worklist = bytearray(b'\x01') * len(blocks)   # 入队标记，避免同一块重复入队
+
+        # IN/OUT集合单调增长: 某块IN新增的位(delta)直接并入各前驱的OUT，
+        # 只有OUT确实增长的前驱才需要重新计算，OUT无需每次从后继重新求并
+        while worklist:
+            _, i = heapq.heappop(worklist)
+            in_worklist[i] = 0
+
+            # 计算IN集合: 当前块的使用变量 ∪ (OUT集合 - 定义变量)
+            new_in = used_vars[i] | (out_sets[i] & keep_masks[i])
+
+            # IN集合有变化时，把新增的变量并入前驱块的OUT
+            if new_in != in_sets[i]:
+                delta = new_in & ~in_sets[i]
+                in_sets[i] = new_in
+                for pred in preds[i]:
+                    if delta & ~out_sets[pred]:
+                        out_sets[pred] |= delta
+                        if not in_worklist[pred]:
+                            in_worklist[pred] = 1
+                            heapq.heappush(worklist, (rank[pred], pred))
+
+        # 相同掩码只还原一次: 活跃集合相同的块(如直线代码的公共后缀)共享同一个frozenset对象
+        interned: dict[int, frozenset[str]] = {}
+
+        def to_set(mask: int) -> frozenset[str]:
+            """辅助函数--位掩码还原为变量名集合(按掩码驻留)"""
+            names = interned.get(mask)
+            if names is None:
+                bits, m = [], mask
+                while m:
+                    low = m & -m
+                    bits.append(var_names[low.bit_length() - 1])
+                    m ^= low
+                names = interned[mask] = frozenset(bits)
+            return names
+
+        in_sets = [to_set(mask) for mask in in_sets]
+        out_sets = [to_set(mask) for mask in out_sets]
         return in_sets, out_sets
\ No newline at end of file
@@ -1,11 +1,12 @@
 """中间代码生成器"""
+import sys
 from dataclasses import dataclass
 from typing import Optional, Dict, List, Union, Tuple
 from compiler_logger import logger
 
-@dataclass
+@dataclass(slots=True)
 class Quadruple:
-    """四元式(纯数据结构)"""
+    """四元式(纯数据结构，使用__slots__存储字段，属性访问更快、占用更小)"""
     op: str                              # 操作类型
     arg1: Union[str, int, float, None]   # 左操作数
     arg2: Union[str, int, float, None]   # 右操作数
@@ -48,7 +49,7 @@ class IntermediateCodeGenerator:
     def emit(self, op, arg1, arg2, result):
         """Emit a new quadruple and add it to the list"""
         logger.debug(f"Emitting quadruple: OP='{op}', ARG1='{arg1}', ARG2='{arg2}', RESULT='{result}'")
-        quad = Quadruple(op, arg1, arg2, result)
+        quad = Quadruple(sys.intern(op), arg1, arg2, result)  # 驻留操作符，后续比较op时可直接命中指针相等
         self.quads.append(quad)
         self.next_quad = len(self.quads)
         return self.next_quad - 1
@@ -52,73 +52,84 @@ class ErrorCode(IntEnum):
 
     @property
     def chinese_description(self) -> str:
-        """获取错误代码的中文描述"""
-        category_prefix = {
-            0x0000: "[通用]",
-            0x1000: "[语法]",
-            0x2000: "[类型]", 
-            0x3000: "[符号]",
-            0x4000: "[运行时]",
-            0x5000: "[限制]",
-            0x9000: "[系统]"
-        }.get(self.value & 0xF000, "")
-
-        descriptions: Dict[ErrorCode, str] = {
-            # 通用错误
-            self.GENERAL_ERROR: "通用错误",
-
-            # 系统错误
-            self.UNKNOWN_ERROR: "未知错误",
-            self.INTERNAL_COMPILER_ERR: "编译器内部错误",
-            
-            # 语法错误
-            self.SYNTAX_ERROR: "语法错误",
-            self.INVALID_PARAM_FORMAT: "无效的参数格式",
-            self.MISSING_SEMICOLON: "缺少分号",
-            self.UNEXPECTED_TOKEN: "意外的符号",
-            
-            # 类型错误
-            self.TYPE_MISMATCH: "类型不匹配",
-            self.INVALID_CAST: "无效的类型转换", 
-            self.ARRAY_TYPE_VIOLATION: "数组类型违规",
-            
-            # 符号错误
-            self.UNDEFINED_SYMBOL: "未定义的符号",
-            self.UNDEFINED_VARIABLE: "未定义的变量",
-            self.UNDEFINED_FUNCTION: "未定义的函数",
-            self.DUPLICATE_SYMBOL: "重复定义的符号",
-            
-            # 运行时错误
-            self.DIVISION_BY_ZERO: "除以零错误",
-            self.OUT_OF_MEMORY: "内存不足",
-            self.STACK_OVERFLOW: "栈溢出",
-            self.INVALID_ARGUMENTS: "无效的函数参数",
-            
-            # 限制警告
-            self.PARAM_LIMIT: "参数数量超过限制",
-            self.DEPRECATED_FEATURE: "使用了已弃用的功能",
-            self.RECURSION_DEPTH: "递归深度超过安全限制"
-        }
-
-        return f"{category_prefix}{descriptions.get(self, '未定义的错误代码')}"
+        """获取错误代码的中文描述(导入时预先生成，见_CHINESE_DESCRIPTIONS)"""
+        return _CHINESE_DESCRIPTIONS[self]
     
     @classmethod
     def get_category(cls, code: int) -> str:
         """获取错误大类名称"""
-        return {
-            0x1000: "Syntax",
-            0x2000: "Type",
-            0x3000: "Symbol",
-            0x4000: "Runtime",
-            0x5000: "Limitation",
-            0x9000: "System"
-        }.get(code & 0xF000, "Unknown")
+        return _CATEGORY_NAMES.get(code & 0xF000, "Unknown")
     
     @property
     def is_fatal(self) -> bool:
         """是否为致命错误(限制类警告返回False)"""
         return (self.value & 0xF000) != 0x5000
 
+# 错误大类 -> 中文前缀
+_CATEGORY_PREFIX: Dict[int, str] = {
+    0x0000: "[通用]",
+    0x1000: "[语法]",
+    0x2000: "[类型]", 
+    0x3000: "[符号]",
+    0x4000: "[运行时]",
+    0x5000: "[限制]",
+    0x9000: "[系统]"
+}
+
+# 错误大类 -> 英文名称
+_CATEGORY_NAMES: Dict[int, str] = {
+    0x1000: "Syntax",
+    0x2000: "Type",
+    0x3000: "Symbol",
+    0x4000: "Runtime",
+    0x5000: "Limitation",
+    0x9000: "System"
+}
+
+# 错误代码 -> 中文描述
+_DESCRIPTIONS: Dict[ErrorCode, str] = {
+    # 通用错误
+    ErrorCode.GENERAL_ERROR: "通用错误",
+
+    # 系统错误
+    ErrorCode.UNKNOWN_ERROR: "未知错误",
+    ErrorCode.INTERNAL_COMPILER_ERR: "编译器内部错误",
+    
+    # 语法错误
+    ErrorCode.SYNTAX_ERROR: "语法错误",
+    ErrorCode.INVALID_PARAM_FORMAT: "无效的参数格式",
+    ErrorCode.MISSING_SEMICOLON: "缺少分号",
+    ErrorCode.UNEXPECTED_TOKEN: "意外的符号",
+    
+    # 类型错误
+    ErrorCode.TYPE_MISMATCH: "类型不匹配",
+    ErrorCode.INVALID_CAST: "无效的类型转换", 
+    ErrorCode.ARRAY_TYPE_VIOLATION: "数组类型违规",
+    
+    # 符号错误
+    ErrorCode.UNDEFINED_SYMBOL: "未定义的符号",
+    ErrorCode.UNDEFINED_VARIABLE: "未定义的变量",
+    ErrorCode.UNDEFINED_FUNCTION: "未定义的函数",
+    ErrorCode.DUPLICATE_SYMBOL: "重复定义的符号",
+    
+    # 运行时错误
+    ErrorCode.DIVISION_BY_ZERO: "除以零错误",
+    ErrorCode.OUT_OF_MEMORY: "内存不足",
+    ErrorCode.STACK_OVERFLOW: "栈溢出",
+    ErrorCode.INVALID_ARGUMENTS: "无效的函数参数",
+    
+    # 限制警告
+    ErrorCode.PARAM_LIMIT: "参数数量超过限制",
+    ErrorCode.DEPRECATED_FEATURE: "使用了已弃用的功能",
+    ErrorCode.RECURSION_DEPTH: "递归深度超过安全限制"
+}
+
+# 每个错误代码带分类前缀的完整描述(枚举成员固定，导入时生成一次)
+_CHINESE_DESCRIPTIONS: Dict[ErrorCode, str] = {
+    code: f"{_CATEGORY_PREFIX.get(code.value & 0xF000, '')}{_DESCRIPTIONS.get(code, '未定义的错误代码')}"
+    for code in ErrorCode
+}
+
 class ErrorException(Exception):
     """自定义错误异常类"""
     def __init__(
@@ -139,7 +150,14 @@ class ErrorException(Exception):
         self.error_code = error_code
         self.code_location = code_location
         self.fix_suggestion = fix_suggestion
-        super().__init__(self._format_chinese_message())
+        self._formatted: Optional[str] = None  # 格式化后的完整信息(首次转换为字符串时生成)
+        super().__init__(message)
+
+    def __str__(self):
+        """被捕获后不打印的异常无需格式化，首次需要时再生成完整信息"""
+        if self._formatted is None:
+            self._formatted = self._format_chinese_message()
+        return self._formatted
 
     def _format_chinese_message(self):
         """
@@ -7,7 +7,9 @@
 输出内容：词汇元素列表
 """
 import os
+import re
 import sys
+import bisect
 sys.path.append(os.getcwd())
 from enum import Enum
 from compiler_logger import logger
@@ -101,21 +103,22 @@ class LexicalType(Enum):
     # 结束符
     EOF = ('$', False, False, False)
 
+    def __init__(self, token_value, is_keyword, is_operator, is_delimiter):
+        # 各字段在创建成员时存为普通实例属性，访问时无需经过property调用
+        self.token_value = token_value      # 终结符名(与文法中的终结符一致)
+        self.is_keyword = is_keyword        # 是否是关键字
+        self.is_operator = is_operator      # 是否是运算符
+        self.is_delimiter = is_delimiter    # 是否是界符
+
     @property
     def value(self):
-        return self._value_[0]
-    @property
-    def is_keyword(self):
-        return self._value_[1]
-    @property
-    def is_operator(self):
-        return self._value_[2]
-    @property
-    def is_delimiter(self):
-        return self._value_[3]
+        """终结符名(兼容旧接口，热路径请直接使用token_value)"""
+        return self.token_value
 
 class LexicalElement:
     """词汇元素"""
+    __slots__ = ('type', 'value', 'line', 'column')  # 每个token一个实例，不需要__dict__
+
     def __init__(self, type_: LexicalType, value_=None, row_=None, col_=None):
         self.type: LexicalType = type_
         self.value = value_
@@ -126,247 +129,128 @@ class LexicalElement:
         # 序列化：[Type:value]（值为空时省略:value）
         return f"[{self.type.name}]" if self.value is None else f"[{self.type.name}:{self.value}]"
 
+# 关键字映射(值 -> 类型)
+_KEYWORDS = {ele.token_value: ele for ele in LexicalType if ele.is_keyword}
+# 运算符与界符映射(值 -> 类型)，两者的值互不重复
+_SYMBOLS = {ele.token_value: ele for ele in LexicalType if ele.is_operator or ele.is_delimiter}
+# 可作为二元运算左操作数结尾的词汇类型：其后的'-'是减号而不是负号
+_VALUE_END_TYPES = frozenset({
+    LexicalType.IDENTIFIER,
+    LexicalType.INTEGER, LexicalType.FLOAT,
+    LexicalType.STRING, LexicalType.CHAR, LexicalType.BOOL,
+    LexicalType.RPAREN, LexicalType.RBRACE, LexicalType.RBRACKET
+})
+# 字符串中的转义字符映射，未知转义字符不转义，原样保留
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '\\': '\\', '"': '"', "'": "'", '0': '\0'}
+_ESCAPE_RE = re.compile(r'\\(.)', re.DOTALL)
+
+# 空白与注释(连续多段一次跳过)
+_SKIP_RE = re.compile(r"(?:\s+|//[^\n]*|/\*.*?\*/)+", re.DOTALL)
+# 所有词汇的单一正则(各分支按分析流程排列；运算符/界符按长度降序，保证最长匹配)
+# 由C实现的正则引擎逐字符扫描，Python层每个词汇只处理一次匹配结果
+_TOKEN_RE = re.compile(
+    r"(?P<number>\d+(?:\.\d+)?)"
+    r'|(?P<string>"(?:[^"\\]|\\.)*")'
+    r"|(?P<ident>[^\W\d]\w*)"
+    r"|(?P<symbol>" + "|".join(re.escape(sym) for sym in sorted(_SYMBOLS, key=len, reverse=True)) + ")",
+    re.DOTALL
+)
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
 class Lexer:
     """词法分析器"""
     def __init__(self):
         self._last_token = None # 上一个词法元素
+        self.reset()
+
     def _error(self, msg):
+        self._update_row_col(self._current_pos)
         message = f"LexicalParser error at line {self._current_row}, column {self._current_col}: {msg}"
         logger.error(message)
         raise Exception(message)
-    
-    def _move_next(self):
-        """移动到下一个字符"""
-        if self._current_char == '\n': # 换行
-            self._current_row += 1
-            self._current_col = 0
-        self._current_pos += 1
-        self._current_col += 1
-        self._current_char = self._input_text[self._current_pos] if self._current_pos < len(self._input_text) else None # 刷新char
 
-    def _peek_next(self, n=1):
-        """预览接下来的第n个字符"""
-        return self._input_text[self._current_pos + n] if self._current_pos + n < len(self._input_text) else None
-        
-    def _ignore_whitespace(self):
-        """忽略空白字符"""
-        while self._current_char is not None and self._current_char.isspace():
-            self._move_next()
-
-    def _ignore_comment(self):
-        """忽略注释"""
-        # 单行注释
-        if self._current_char == '/' and self._peek_next() == '/':
-            # 跳过接下来的整行内容
-            while self._current_char is not None and self._current_char != '\n':
-                self._move_next()
-        # 多行注释
-        elif self._current_char == '/' and self._peek_next() == '*':
-            # 跳过/*
-            self._move_next()
-            self._move_next()
-            # 跳过内容，直到*/
-            while self._current_char is not None and (self._current_char != '*' or self._peek_next() != '/'):
-                if self._current_char == '\n':
-                    self._current_row += 1
-                    self._current_col = 0
-                self._move_next()
-            if self._current_char is None: # 如果直到文件结束都没有找到*/，报错
-                self._error("Unterminated multi-line comment")
-            # 跳过*/
-            self._move_next()
-            self._move_next()
+    def _update_row_col(self, pos):
+        """由偏移量计算行号与列号(行首偏移表二分查找)"""
+        row = bisect.bisect_right(self._line_starts, pos)
+        self._current_row = row
+        self._current_col = pos - self._line_starts[row - 1] + 1
 
-    def _process_number(self):
-            start_row = self._current_row
-            start_col = self._current_col
-            buffer = ''
-            is_float = False
-            
-            # 处理负号（当满足一元操作符条件时）
-            if self._current_char == '-':
-                if self._peek_next() and self._peek_next().isdigit():
-                    # 检查负号是否属于一元操作符（表达式开头/运算符/界符后）
-                    if self._last_token is None or self._last_token.type not in [
-                        LexicalType.IDENTIFIER, 
-                        LexicalType.INTEGER, LexicalType.FLOAT,
-                        LexicalType.STRING, LexicalType.CHAR, LexicalType.BOOL,
-                        LexicalType.RPAREN, LexicalType.RBRACE, LexicalType.RBRACKET
-                    ]:
-                        buffer = '-'
-                        self._move_next()  # 跳过负号
-                    else:
-                        token = self._process_operator()  # 处理负号作为运算符
-                        if token:  # 如果是有效的运算符
-                            self._last_token = token  # 更新last_token
-                            return token  # 返回运算符元素
-            
-            # 处理数字部分（整数部分）
-            while self._current_char and self._current_char.isdigit():
-                buffer += self._current_char
-                self._move_next()
-            
-            # 处理浮点数（小数点后必须跟数字）
-            if self._current_char == '.' and self._peek_next() and self._peek_next().isdigit():
-                is_float = True
-                buffer += self._current_char
-                self._move_next()
-                while self._current_char and self._current_char.isdigit():
-                    buffer += self._current_char
-                    self._move_next()
-            
-            try:
-                value = float(buffer) if is_float else int(buffer)
-                return LexicalElement(
-                    LexicalType.FLOAT if is_float else LexicalType.INTEGER, 
-                    value, start_row, start_col
-                )
-            except ValueError:
-                self._error(f"Invalid numeric literal: {buffer}")
+    def _make_element(self, lexical_type, value, start):
+        """生成词汇元素(行列号取起始位置)并记录为上一个词法元素"""
+        self._update_row_col(start)
+        token = LexicalElement(lexical_type, value, self._current_row, self._current_col)
+        self._last_token = token
+        return token
 
-    def _process_string(self):
-        """处理字符串"""
-        start_row = self._current_row # 缓存起始行号
-        start_col = self._current_col # 缓存起始列号
-        escape_mappings = { # 转义字符字符串与转义字符实体映射
-            'n': '\n',
-            't': '\t',
-            'r': '\r',
-            '\\': '\\',
-            '"': '"',
-            "'": "'",
-            '0': '\0'
-        }
-        buffer = [] # 存储字符串
+    def _get_next_element(self):
+        """获取下一个LexicalElement"""
+        text = self._input_text
+        pos = self._current_pos
+        if skipped := _SKIP_RE.match(text, pos):   # 忽略空白与注释
+            pos = skipped.end()
+        m = _TOKEN_RE.match(text, pos)
+        if m is not None:
+            kind = m.lastgroup
 
-        self._move_next() # 跳过开始的引号
-        while self._current_char and self._current_char != '"': # 循环直到引号结束
-            if self._current_char != '\\': # 非转义字符字符串前缀，即普通字符
-                buffer.append(self._current_char)
-            else: # 转义字符处理
-                self._move_next() # 跳过\
-                if not self._current_char: # 如果文件结束，退出
-                    break
-                # 获取转义字符实体，未知转义字符将不会进行转义，直接输出原字符
-                buffer.append(escape_mappings.get(self._current_char, f"\\{self._current_char}"))
-            self._move_next()
-        if self._current_char is None: # 如果直到文件结束都没有找到"，报错
-            self._error("Unterminated string literal")
-        self._move_next() # 跳过结束的引号
-        # 返回字符串元素
-        return LexicalElement(LexicalType.STRING, ''.join(buffer), start_row, start_col)
-    
-    def _process_identifier(self):
-        """处理标识符/关键字"""
-        start_row = self._current_row # 缓存起始行号
-        start_col = self._current_col # 缓存起始列号
-        keyword_mappings = {ele.value: ele for ele in LexicalType if ele.is_keyword} # 关键字映射
-        buffer = [] # 存储标识符
+            # 处理负号（当满足一元操作符条件时，与其后的数字合为负数）
+            if (kind == 'symbol' and text[pos] == '-' and pos + 1 < len(text) and text[pos + 1].isdigit()
+                    and (self._last_token is None or self._last_token.type not in _VALUE_END_TYPES)):
+                m = _NUMBER_RE.match(text, pos + 1)
+                if m is None:
+                    self._current_pos = pos
+                    self._error(f"Invalid numeric literal: -{text[pos + 1]}")
+                kind = 'number'
+                buffer = text[pos:m.end()]
+            else:
+                buffer = m.group()
 
-        # 匹配标识符，允许字母数字下划线
-        while self._current_char and (self._current_char.isalnum() or self._current_char == '_'):
-            buffer.append(self._current_char)
-            self._move_next()
-        identifier = ''.join(buffer) # 拼接成字符串
-        lexical_type = keyword_mappings.get(identifier, LexicalType.IDENTIFIER) # 是否是关键字
-        return LexicalElement(lexical_type, identifier, start_row, start_col)
-    
-    def _process_operator(self):
-        """处理运算符"""
-        start_row = self._current_row # 缓存起始行号
-        start_col = self._current_col # 缓存起始列号
-        operator_mappings = {ele.value: ele for ele in LexicalType if ele.is_operator} # 运算符映射
-
-        # 尝试匹配三字符运算符
-        if self._current_char and self._peek_next() and self._peek_next(2):
-            op = self._current_char + self._peek_next() + self._peek_next(2)
-            if op in operator_mappings: # 如果是三字符运算符
-                self._move_next()
-                self._move_next()
-                self._move_next()
-                return LexicalElement(operator_mappings[op], op, start_row, start_col)
-        # 尝试匹配双字符运算符
-        if self._current_char and self._peek_next(): # 如果有足够的字符
-            op = self._current_char + self._peek_next()
-            if op in operator_mappings: # 如果是双字符运算符
-                self._move_next()
-                self._move_next()
-                return LexicalElement(operator_mappings[op], op, start_row, start_col)
-            if op == '->': # 如果是->，退出，将转_process_delimiters处理
-                return None
-        # 单字符运算符处理
-        if self._current_char in operator_mappings:
-            op = self._current_char
-            self._move_next()
-            return LexicalElement(operator_mappings[op], op, start_row, start_col)
-        return None
+            # 多行注释未闭合时'/'会被当作运算符匹配
+            if kind == 'symbol' and buffer == '/' and text.startswith('*', pos + 1):
+                self._current_pos = len(text)
+                self._error("Unterminated multi-line comment")
 
-    def _process_delimiters(self):
-        """处理界符，返回对应的LexicalElement"""
-        start_row = self._current_row # 缓存起始行号
-        start_col = self._current_col # 缓存起始列号
-        delimiter_mappings = {ele.value: ele for ele in LexicalType if ele.is_delimiter} # 界符映射
+            start, self._current_pos = pos, m.end()
+            # 标识符只能以字母或'_'开头；\w还包含数字类字符:
+            # str.isdigit()为真但不是十进制数字的字符(如'²')无法转换为数值，其余(如'Ⅻ')为未知字符
+            # ASCII字符已由正则区分，只有非ASCII字符才需要查Unicode属性表
+            if kind == 'ident':
+                first = buffer[0]
+                if first >= '\x80' and not first.isalpha():
+                    if first.isdigit():
+                        self._error(f"Invalid numeric literal: {buffer}")
+                    self._current_pos = start
+                    self._error(f"Unknown character: {first}")
+            elif kind == 'number':
+                following = text[self._current_pos:self._current_pos + 1]
+                if following >= '\x80' and following.isdigit():
+                    self._error(f"Invalid numeric literal: {buffer}")
+            if kind == 'number':
+                is_float = '.' in buffer
+                return self._make_element(
+                    LexicalType.FLOAT if is_float else LexicalType.INTEGER,
+                    float(buffer) if is_float else int(buffer), start
+                )
+            if kind == 'string':
+                value = _ESCAPE_RE.sub(lambda e: _ESCAPES.get(e.group(1), e.group()), buffer[1:-1])
+                return self._make_element(LexicalType.STRING, value, start)
+            # 关键字/运算符/界符复用枚举中的规范字符串，标识符驻留，相同的值共享同一个字符串对象
+            if kind == 'ident':
+                keyword = _KEYWORDS.get(buffer)
+                if keyword is None:
+                    return self._make_element(LexicalType.IDENTIFIER, sys.intern(buffer), start)
+                return self._make_element(keyword, keyword.token_value, start)
+            symbol = _SYMBOLS[buffer]
+            return self._make_element(symbol, symbol.token_value, start)
 
-        # 双字符界符检查
-        if self._current_char and self._peek_next():
-            str = self._current_char + self._peek_next()
-            if str in delimiter_mappings:
-                self._move_next()
-                self._move_next()
-                return LexicalElement(delimiter_mappings[str], str, start_row, start_col)
-        # 单字符界符检查
-        if self._current_char in delimiter_mappings:
-            str = self._current_char
-            self._move_next()
-            return LexicalElement(delimiter_mappings[str], str, start_row, start_col)
-        return None
+        self._current_pos = pos
+        if pos < len(text):
+            if text[pos] == '"': # 如果直到文件结束都没有找到"，报错
+                self._current_pos = len(text)
+                self._error("Unterminated string literal")
+            self._error(f"Unknown character: {text[pos]}")      # 其他
 
-    def _get_next_element(self):
-        """获取下一个LexicalElement"""
-        while self._current_char is not None:
-            if self._current_char.isspace():                             # 忽略空白
-                self._ignore_whitespace()
-                continue
-            if self._current_char == '/' and (self._peek_next() == '/' or self._peek_next() == '*'): # 忽略注释
-                self._ignore_comment()
-                continue
-                
-            # 处理数字（包括负数）
-            if self._current_char and (self._current_char.isdigit() or 
-                (self._current_char == '-' and self._peek_next() and self._peek_next().isdigit())):
-                token = self._process_number()
-                if token:
-                    self._last_token = token  # 更新last_token
-                    return token
-                    
-            # 处理字符串
-            if self._current_char == '"':                                
-                token = self._process_string()
-                self._last_token = token  # 更新last_token
-                return token
-                
-            # 处理标识符和关键字
-            if self._current_char.isalpha() or self._current_char == '_': 
-                token = self._process_identifier()
-                self._last_token = token  # 更新last_token
-                return token
-                
-            # 处理运算符
-            if operator_token := self._process_operator():              
-                self._last_token = operator_token  # 更新last_token
-                return operator_token
-                
-            # 处理界符
-            if delimiter_token := self._process_delimiters():           
-                self._last_token = delimiter_token  # 更新last_token
-                return delimiter_token
-                
-            self._error(f"Unknown character: {self._current_char}")      # 其他
-        
         # 文件结束
-        eof_token = LexicalElement(LexicalType.EOF, None, self._current_row, self._current_col)
-        self._last_token = eof_token  # 更新last_token
-        return eof_token
+        return self._make_element(LexicalType.EOF, None, pos)
     
     def _log_parsing_result(self, elements):
         """输出词法分析结果"""
@@ -389,20 +273,23 @@ class Lexer:
         
         :param input_text_: 输入文本
         """
-        # 重置解析器状态
-        self._input_text = input_text or "" # 输入文本
-        self._current_pos = 0 # 当前位置
-        self._current_row = 1 # 当前行号
-        self._current_col = 1 # 当前列号
-        self._current_char = self._input_text[0] if self._input_text else None # 当前字符
-        # 词法分析
-        elements = []
-        while True:
-            elements.append(self._get_next_element())
-            if elements[-1].type == LexicalType.EOF: # 如果是文件结束符，结束循环
-                break
+        self.reset(input_text) # 重置解析器状态
+        elements = list(self) # 词法分析
         self._log_parsing_result(elements)
         return elements
+
+    def __iter__(self):
+        """
+        按需逐个产生词法元素(包括最后的EOF)，不在内存中保存整个词法元素序列
+
+        Note:
+            迭代从当前位置开始，调用前需先reset()设置输入文本
+        """
+        while True:
+            element = self._get_next_element()
+            yield element
+            if element.type is LexicalType.EOF: # 如果是文件结束符，结束迭代
+                return
     
     def reset(self, input_text=None):
         """重置词法分析器状态"""
@@ -410,4 +297,4 @@ class Lexer:
         self._current_pos = 0 # 当前位置
         self._current_row = 1 # 当前行号
         self._current_col = 1 # 当前列号
-        self._current_char = self._input_text[0] if self._input_text else None # 当前字符
+        self._line_starts = [0, *(m.end() for m in re.finditer('\n', self._input_text))] # 各行行首偏移
@@ -1,5 +1,8 @@
 """Rust-like语法分析器"""
 from collections import namedtuple, defaultdict
+from collections.abc import Sequence
+from typing import Optional
+import hashlib, inspect, json, os, pickle
 from compiler_parser_node import ParseNode
 from compiler_rust_grammar import RUST_GRAMMAR_PPT
 from compiler_semantic_checker import SemanticChecker
@@ -10,7 +13,65 @@ from compiler_lexer import Lexer, LexicalType, LexicalElement
 # 定义LR(1)项目
 LR1Item = namedtuple('LR1Item', ['lhs', 'rhs', 'dot', 'lookahead'])
 
+class ParseSteps(Sequence):
+    """
+        语法分析过程记录(按需生成每一步的详情)
+
+    Note:
+        分析时每步只记录(input_pos, 产生式编号/-1, 入栈状态, 移入的token)，
+        并每隔CHECKPOINT步保存一次状态栈/节点栈快照；
+        访问第i步时从最近的快照向后重放，得到与逐步记录相同的字典
+    """
+    CHECKPOINT = 256
+
+    def __init__(self, parser: "Parser"):
+        self._rule_lhs = parser.rule_lhs
+        self._rule_rhs_len = parser.rule_rhs_len
+        self._rule_texts = parser.rule_texts
+        self._log = []          # 每步: (input_pos, prod_idx(移入为-1), 新入栈状态, 移入的token)
+        self._checkpoints = []  # 第k*CHECKPOINT步执行前的(状态栈, 节点栈字符串)快照
+
+    def __len__(self):
+        return len(self._log)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._log)))]
+        if index < 0:
+            index += len(self._log)
+        if not 0 <= index < len(self._log):
+            raise IndexError("分析步骤下标越界")
+        base = index // self.CHECKPOINT
+        states, node_strs = self._checkpoints[base]
+        states, node_strs = states.copy(), node_strs.copy()
+        log, rule_lhs, rule_rhs_len = self._log, self._rule_lhs, self._rule_rhs_len
+        for input_pos, prod_idx, new_state, token in log[base * self.CHECKPOINT:index]:
+            if prod_idx < 0:
+                node_strs.append(f"{token.type.token_value}({token.value})")  # 与ParseNode.__str__一致
+            else:
+                rhs_len = rule_rhs_len[prod_idx]
+                if rhs_len > 0:
+                    del states[-rhs_len:]
+                    del node_strs[-rhs_len:]
+                node_strs.append(f"{rule_lhs[prod_idx]}[{rhs_len}]")
+            states.append(new_state)
+
+        input_pos, prod_idx, new_state, token = log[index]
+        if prod_idx < 0:
+            action, production = f"移入: {token} -> 状态{new_state}", ""
+        else:
+            action, production = f"规约: 使用产生式 {prod_idx}", self._rule_texts[prod_idx]
+        return {
+            "stack": states,
+            "node_stack": node_strs,
+            "input_pos": input_pos,
+            "action": action,
+            "production": production
+        }
+
 class Parser:
+    TABLE_FORMAT_VERSION = 1  # 分析表(动作元组)格式版本，修改构建算法或动作格式时递增，使旧的磁盘缓存失效
+
     def __init__(self):
         self._first_cache = {}
         self.lexer = Lexer()
@@ -28,6 +89,12 @@ class Parser:
             self.non_terminals.add(left)
             self.rules[left].append({'rhs': right, 'idx': idx})
             self.rule_index_map[idx] = {'lhs': left, 'rhs': right}
+        # 按产生式编号索引的扁平表，供分析驱动循环规约时直接取用
+        productions = self.grammar['productions']
+        self.rule_lhs = [prod['prod_lhs'] for prod in productions]
+        self.rule_rhs_len = [len(prod['prod_rhs']) for prod in productions]
+        self.rule_texts = [f"{prod['prod_lhs']} → {' '.join(prod['prod_rhs']) if prod['prod_rhs'] else 'ε'}"
+                           for prod in productions]
         self._print_grammar()
 
     def closure(self, items):
@@ -109,10 +176,68 @@ class Parser:
         self._first_cache[key] = result
         return result
 
-    def build_table(self, grammar):
-        """构建LR(1)分析表"""
+    @classmethod
+    def _grammar_key(cls, grammar) -> str:
+        """
+            计算分析表缓存的键
+
+        Note:
+            由文法的稳定哈希(集合按排序后的列表序列化)、分析表格式版本和Parser类源码共同决定，
+            构建算法或动作格式改变后不会误用旧缓存；无法读取源码时(如打包发布)仅依赖版本号
+        """
+        try:
+            builder_src = inspect.getsource(cls)
+        except (OSError, TypeError):
+            builder_src = ''
+        text = json.dumps(grammar, sort_keys=True, ensure_ascii=False, default=sorted)
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (str(cls.TABLE_FORMAT_VERSION), builder_src, text):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _load_table_cache(self, cache_path: str) -> bool:
+        """从磁盘加载分析表缓存，成功返回True"""
+        if not os.path.exists(cache_path):
+            return False
+        try:
+            with open(cache_path, 'rb') as f:
+                self.action, self.goto_tbl = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"分析表缓存\"{cache_path}\"读取失败，重新构建: {e}")
+            return False
+        self.states = []  # 缓存中不保存项目集
+        logger.debug(f"从缓存加载分析表: {cache_path}")
+        return True
+
+    def _save_table_cache(self, cache_path: str):
+        """将分析表写入磁盘缓存(写入失败不影响分析)"""
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((self.action, self.goto_tbl), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.warning(f"分析表缓存\"{cache_path}\"写入失败: {e}")
+
+    def build_table(self, grammar, cache_dir: Optional[str] = None):
+        """
+            构建LR(1)分析表
+
+        Args:
+            grammar: 文法定义
+            cache_dir: 分析表缓存目录；提供时按文法哈希读取/写入缓存，文法不变时无需重新构建
+        """
         self.grammar = grammar
         self._setup_grammar()
+
+        cache_path = None
+        if cache_dir:
+            cache_path = os.path.join(cache_dir, f"{self._grammar_key(grammar)}.pkl")
+            if self._load_table_cache(cache_path):
+                return self.action, self.goto_tbl
+
         logger.debug("开始构建LR(1)分析表")
         self.action = defaultdict(dict)
         self.goto_tbl = defaultdict(dict)
@@ -159,83 +284,91 @@ class Parser:
                                 self.action[sid][item.lookahead] = ('reduce', prod['idx'])
                                 break
         logger.debug(f"分析表构建完成，共{len(self.states)}个状态")
+        if cache_path:
+            self._save_table_cache(cache_path)
         return self.action, self.goto_tbl
 
     def parse(self, code = None, checker: SemanticChecker = None):
-        """LR(1)语法分析"""
+        """
+            LR(1)语法分析
+
+        Note:
+            驱动循环中把分析表/产生式等属性绑定为局部变量；栈原地截断；
+            节点的字符串形式在入栈时生成一次；
+            每一步只记录动作与剩余输入在code中的起始偏移(input_pos)，步骤详情由ParseSteps按需重放生成，
+            避免为每一步复制整个状态栈/节点栈
+        """
         self.lexer.reset(code)
-        steps = []
+        lexer = self.lexer
+        next_token = iter(lexer).__next__  # 按需从词法分析器拉取token，不预先生成整个token列表
+        action_tbl = self.action
+        goto_tbl = self.goto_tbl
+        rule_lhs, rule_rhs_len, rule_texts = self.rule_lhs, self.rule_rhs_len, self.rule_texts
+        steps = ParseSteps(self)
+        log_append = steps._log.append
+        checkpoints = steps._checkpoints
+        checkpoint_every = ParseSteps.CHECKPOINT
         state_stack = [0]
         node_stack = []
+        node_strs = []   # 与node_stack对应的字符串形式(仅用于步骤快照)
         changed = True
-        # token_list = list(tokens)
         while True:
             state = state_stack[-1]
-            # cur_token = token_list[idx]
             if changed:
-                input_pos = self.lexer._current_pos
-                cur_token = self.lexer._get_next_element()
+                input_pos = lexer._current_pos
+                cur_token = next_token()
+                cur_symbol = cur_token.type.token_value  # 终结符名每个token只取一次
                 changed = False
-            else:
-                cur_token = cur_token
-                input_pos = input_pos
-            if cur_token.type == LexicalType.EOF:
-                logger.debug("到达文件末尾，结束分析")
-            offset = self.lexer._current_pos - input_pos
-            step = {
-                "stack": list(state_stack),
-                "node_stack": [str(n) for n in node_stack],
-                "input": [code[self.lexer._current_pos-offset:]],
-                "action": "",
-                "production": ""
-            }
-            action = self.action[state].get(cur_token.type.value)
+                if cur_token.type is LexicalType.EOF:
+                    logger.debug("到达文件末尾，结束分析")
+            if len(steps._log) % checkpoint_every == 0:
+                checkpoints.append((state_stack.copy(), node_strs.copy()))
+            action = action_tbl[state].get(cur_symbol)
             if not action:
-                expected = sorted(self.action[state].keys())
-                # context = token_list[max(0, idx-2):idx+1]
-                context = code[max(0, self.lexer._current_pos-20):self.lexer._current_pos+20]
+                expected = sorted(action_tbl[state].keys())
+                context = code[max(0, lexer._current_pos-20):lexer._current_pos+20]
                 raise SyntaxError(
                     f"语法错误（第{cur_token.line}行, 第{cur_token.column}列）\n"
                     f"意外Token: {cur_token}\n"
                     f"期望: {expected}\n"
                     f"上下文: {context}"
                 )
-            if action[0] == 'shift':
-                step["action"] = f"移入: {cur_token} -> 状态{action[1]}"
+            kind = action[0]
+            if kind == 'shift':
                 terminal_node = ParseNode(
-                    symbol=cur_token.type.value,
+                    symbol=cur_symbol,
                     children=None,
                     token=cur_token
                 )
                 node_stack.append(terminal_node)  # 这里是终结符节点
+                node_strs.append(str(terminal_node))
                 changed = True
                 state_stack.append(action[1])
-            elif action[0] == 'reduce':
+                log_append((input_pos, -1, action[1], cur_token))
+            elif kind == 'reduce':
                 prod_idx = action[1]
-                prod = self.rule_index_map[prod_idx]
-                lhs = prod['lhs']
-                rhs_len = len(prod['rhs'])
-                step["production"] = f"{lhs} → {' '.join(prod['rhs']) if prod['rhs'] else 'ε'}"
-                step["action"] = f"规约: 使用产生式 {prod_idx}"
+                lhs = rule_lhs[prod_idx]
+                rhs_len = rule_rhs_len[prod_idx]
                 children = []
                 if rhs_len > 0:
-                    state_stack = state_stack[:-rhs_len]
+                    del state_stack[-rhs_len:]
                     children = node_stack[-rhs_len:]
-                    node_stack = node_stack[:-rhs_len]
+                    del node_stack[-rhs_len:]
+                    del node_strs[-rhs_len:]
                 new_node = ParseNode(symbol=lhs, children=children)  # 这里是非终结符节点
                 if checker:
                     checker.on_reduce(node=new_node)
                 node_stack.append(new_node)
-                goto_state = self.goto_tbl[state_stack[-1]].get(lhs)
+                node_strs.append(str(new_node))
+                goto_state = goto_tbl[state_stack[-1]].get(lhs)
                 if goto_state is None:
                     raise SyntaxError(f"无效GOTO：状态{state_stack[-1]}遇到{lhs}")
                 state_stack.append(goto_state)
-            elif action[0] == 'accept':
-                step["action"] = "接受: 分析完成"
+                log_append((input_pos, prod_idx, goto_state, None))
+            elif kind == 'accept':
                 break
             else:
                 raise SyntaxError(f"无效动作: {action}")
-            steps.append(step)
         return node_stack[0], steps
 
     @staticmethod
@@ -4,7 +4,7 @@ from typing import Optional, List, Any
 from compiler_lexer import LexicalElement   
 from compiler_semantic_symbol import UnitType
 
-@dataclass
+@dataclass(slots=True)
 class SynthesizedAttributes:
     """综合属性"""
     place: Optional[str] = None                             # 值存储位置(常量值或变量名称)
@@ -31,6 +31,8 @@ class SynthesizedAttributes:
     call_info: Optional[dict] = None      # {'args':[str], 'arg_types':[Type], 'ret_temp':str}
 
 class ParseNode:
+    __slots__ = ('symbol', 'children', 'token', 'value', 'line', 'column', 'last_return', '_attributes')  # 每个树节点一个实例，不需要__dict__
+
     def __init__(
             self, 
             symbol: str, 
@@ -55,9 +57,20 @@ class ParseNode:
 
         self.last_return = False    # 判断最后一个语句是不是返回语句
 
-        # 综合属性
-        self.attributes: Optional[SynthesizedAttributes] = SynthesizedAttributes()
-        
+        # 综合属性(首次访问时才创建，未参与语义计算的节点不分配)
+        self._attributes: Optional[SynthesizedAttributes] = None
+
+    @property
+    def attributes(self) -> SynthesizedAttributes:
+        """综合属性"""
+        if self._attributes is None:
+            self._attributes = SynthesizedAttributes()
+        return self._attributes
+
+    @attributes.setter
+    def attributes(self, value: SynthesizedAttributes):
+        self._attributes = value
+
     def is_terminal(self):
         """判断是否为终结符节点"""
         return self.token is not None
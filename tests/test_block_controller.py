@@ -0,0 +1,99 @@
+"""
+基本块控制器测试
+
+重复分析同一份代码时命中函数级分析缓存，结果必须与重新计算一致，
+且基本块中是本次传入的四元式对象，CFG与集合列表可由调用方自由修改
+"""
+import logging
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+import compiler_block_spilt
+from compiler_block_spilt import BlockController
+from compiler_parser import Parser
+from compiler_rust_grammar import RUST_GRAMMAR_PPT
+from compiler_semantic_checker import SemanticChecker
+
+SOURCE = """
+fn f(n: i32) -> i32 {
+    let mut s = 0;
+    let mut i = 0;
+    while i < n { if i > 2 { s = s + i; } else { s = s - 1; } i = i + 1; }
+    return s;
+}
+fn main() { let r = f(5); }
+"""
+
+
+class BlockControllerCacheTest(unittest.TestCase):
+    """函数级分析缓存"""
+
+    @classmethod
+    def setUpClass(cls):
+        logging.getLogger('compiler_logger').setLevel(logging.CRITICAL)
+        for handler in logging.getLogger('compiler_logger').handlers:
+            handler.setLevel(logging.CRITICAL)
+        cls.parser = Parser()
+        cls.parser.build_table(RUST_GRAMMAR_PPT)
+
+    def analyse(self, source: str = SOURCE) -> BlockController:
+        checker = SemanticChecker()
+        self.parser.parse(code=source.strip(), checker=checker)
+        quads = checker.get_quads()
+        return BlockController([(i, q) for i, q in enumerate(quads)][1:], checker.symbolTable)
+
+    @staticmethod
+    def snapshot(controller: BlockController) -> dict:
+        return {
+            'blocks': {f: [[(idx, tuple(q)) for idx, q in block] for block in blocks]
+                       for f, blocks in controller.func_blocks.items()},
+            'cfgs': controller.func_cfgs,
+            'live': controller.live_vars,
+        }
+
+    def test_cache_hit_matches_fresh_analysis(self):
+        compiler_block_spilt._ANALYSIS_CACHE.clear()
+        fresh = self.analyse()
+        expected = self.snapshot(fresh)
+        self.assertTrue(compiler_block_spilt._ANALYSIS_CACHE)
+
+        cached = self.analyse()
+        self.assertEqual(self.snapshot(cached), expected)
+
+        # 命中时基本块由本次的四元式切分，容器不与之前的结果共享
+        own_quads = {id(q) for _, q in cached.quads}
+        for f, blocks in cached.func_blocks.items():
+            self.assertTrue(all(id(q) in own_quads for block in blocks for _, q in block))
+            self.assertIsNot(blocks, fresh.func_blocks[f])
+            self.assertIsNot(cached.func_cfgs[f], fresh.func_cfgs[f])
+            self.assertIsNot(cached.live_vars[f][0], fresh.live_vars[f][0])
+
+        # 修改本次结果不影响后续分析
+        for f in cached.func_blocks:
+            cached.func_blocks[f].clear()
+            cached.func_cfgs[f].clear()
+            cached.live_vars[f][0].clear()
+        self.assertEqual(self.snapshot(self.analyse()), expected)
+
+    def test_changed_code_is_reanalysed(self):
+        compiler_block_spilt._ANALYSIS_CACHE.clear()
+        changed = SOURCE.replace("s = s + i;", "s = s + i * n;")
+        before = self.snapshot(self.analyse())
+        after = self.snapshot(self.analyse(changed))
+        self.assertNotEqual(after['blocks'], before['blocks'])
+
+        compiler_block_spilt._ANALYSIS_CACHE.clear()
+        self.assertEqual(self.snapshot(self.analyse(changed)), after)
+
+    def test_cache_is_bounded(self):
+        compiler_block_spilt._ANALYSIS_CACHE.clear()
+        for k in range(compiler_block_spilt._ANALYSIS_CACHE_SIZE + 10):
+            self.analyse(f"fn main() {{ let a = {k}; let b = a + 1; }}")
+        self.assertLessEqual(len(compiler_block_spilt._ANALYSIS_CACHE), compiler_block_spilt._ANALYSIS_CACHE_SIZE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,286 @@
+"""
+目标代码差分测试
+
+同一份源代码分别:
+    1. 直接解释执行四元式(中间代码)
+    2. 生成MIPS汇编后在简易模拟器中执行
+比较两者每次调用sink函数时传入的参数序列，覆盖分支、循环、函数调用与寄存器溢出
+"""
+import logging
+import os
+import random
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from compiler_aimcodegenerator import AimCodeGenerator
+from compiler_block_spilt import BlockController
+from compiler_parser import Parser
+from compiler_rust_grammar import RUST_GRAMMAR_PPT
+from compiler_semantic_checker import SemanticChecker
+from compiler_semantic_symbol import ParameterSymbol
+
+MAX_STEPS = 200_000  # 两种执行方式的最大步数(防止错误代码陷入死循环)
+
+SINK = "fn sink(x: i32) -> i32 { return x; }\n"
+
+_COMPARE = {
+    '+': lambda a, b: a + b, '-': lambda a, b: a - b, '*': lambda a, b: a * b,
+    '<': lambda a, b: int(a < b), '<=': lambda a, b: int(a <= b),
+    '>': lambda a, b: int(a > b), '>=': lambda a, b: int(a >= b),
+    '==': lambda a, b: int(a == b), '!=': lambda a, b: int(a != b),
+}
+
+_MIPS_BINARY = {
+    'add': _COMPARE['+'], 'sub': _COMPARE['-'], 'mul': _COMPARE['*'],
+    'slt': _COMPARE['<'], 'sle': _COMPARE['<='], 'sgt': _COMPARE['>'],
+    'sge': _COMPARE['>='], 'seq': _COMPARE['=='], 'sne': _COMPARE['!='],
+}
+
+
+def run_quads(quads, symbol_table):
+    """解释执行四元式，返回sink收到的参数序列"""
+    controller = BlockController([(i, q) for i, q in enumerate(quads)][1:], symbol_table)
+    entries = controller.func_entries
+    entry_names = {idx: name for name, idx in entries.items()}
+    params = {
+        name: [s.name for s in symbol_table.find_scope(name).symbols.values() if isinstance(s, ParameterSymbol)]
+        for name in entries
+    }
+
+    out = []
+    env, func, pc = {}, 'main', entries['main']
+    call_stack, pending, ret = [], {}, None
+    value = lambda x: ret if x == '$ret_reg' else (env[x] if isinstance(x, str) else x)
+    for _ in range(MAX_STEPS):
+        quad = quads[pc]
+        op, arg1, arg2, result = quad.op, quad.arg1, quad.arg2, quad.result
+        pc += 1
+        if op == '=':
+            env[result] = value(arg1)
+        elif op in _COMPARE:
+            env[result] = _COMPARE[op](value(arg1), value(arg2))
+        elif op == 'j':
+            pc = result
+        elif op == 'jnz':
+            if value(arg1) != 0:
+                pc = result
+        elif op == 'param':
+            pending[int(result.removeprefix('param').lstrip('_'))] = value(arg1)
+        elif op == 'call':
+            if arg1 == 'sink':
+                out.append(pending[1])
+            call_stack.append((env, func, pc))
+            env = {name: pending[i] for i, name in enumerate(params[arg1], 1)}
+            func, pc, pending = arg1, entries[arg1], {}
+        elif op == 'RETURN':
+            if func == 'main':
+                return out
+            ret = value(arg1) if arg1 is not None else None
+            env, func, pc = call_stack.pop()
+        else:
+            raise AssertionError(f"未知四元式: {quad}")
+        assert pc not in entry_names or entry_names[pc] == func, "执行越过了函数边界"
+    raise AssertionError("四元式执行步数超限")
+
+
+def run_mips(code):
+    """在简易模拟器中执行生成的MIPS代码，返回每次调用sink时$a0的值"""
+    program, labels = [], {}
+    for line in code:
+        text = line.split('#', 1)[0].strip()
+        if not text or text.startswith('.'):
+            continue
+        if text.endswith(':'):
+            labels[text[:-1]] = len(program)
+            continue
+        op, _, rest = text.partition(' ')
+        program.append((op, [a.strip() for a in rest.split(',')] if rest else []))
+
+    regs, memory, out = {'$sp': 1 << 20, '$ra': -1}, {}, []
+    get = lambda r: 0 if r == '$zero' else regs[r]
+
+    def address(operand):
+        offset, base = re.fullmatch(r'(-?\d+)\((\$\w+)\)', operand).groups()
+        return int(offset) + get(base)
+
+    pc = labels['main']
+    for _ in range(MAX_STEPS):
+        op, args = program[pc]
+        pc += 1
+        if op in _MIPS_BINARY:
+            regs[args[0]] = _MIPS_BINARY[op](get(args[1]), get(args[2]))
+        elif op == 'li':
+            regs[args[0]] = int(args[1])
+        elif op == 'addi':
+            regs[args[0]] = get(args[1]) + int(args[2])
+        elif op == 'slti':
+            regs[args[0]] = int(get(args[1]) < int(args[2]))
+        elif op == 'lw':
+            regs[args[0]] = memory[address(args[1])]  # 读取未写入的栈单元直接报错
+        elif op == 'sw':
+            memory[address(args[1])] = get(args[0])
+        elif op == 'j':
+            pc = labels[args[0]]
+        elif op == 'bne':
+            if get(args[0]) != get(args[1]):
+                pc = labels[args[2]]
+        elif op == 'jal':
+            if args[0] == 'sink':
+                out.append(get('$a0'))
+            regs['$ra'], pc = pc, labels[args[0]]
+        elif op == 'jr':
+            pc = get('$ra')
+        elif op == 'syscall':
+            if get('$v0') == 10:
+                return out
+        else:
+            raise AssertionError(f"未知指令: {op}")
+    raise AssertionError("MIPS执行步数超限")
+
+
+def random_program(rng: random.Random, var_num: int) -> str:
+    """生成含循环、分支与函数调用的随机程序(循环次数有界，不含除法)"""
+    lines = [SINK]
+    helpers = []
+    for h in range(rng.randint(1, 3)):
+        arity = rng.randint(1, 3)
+        args = [f"p{i}" for i in range(arity)]
+        body = [f"    let mut r = {args[0]};"]
+        if helpers and rng.random() < 0.5:
+            callee, callee_arity = rng.choice(helpers)
+            body.append(f"    r = r + {callee}({', '.join(rng.choice(args) for _ in range(callee_arity))});")
+        body.append(f"    if {rng.choice(args)} > {rng.randint(-2, 3)} {{ r = r + {rng.choice(args)}; }} else {{ r = r - 1; }}")
+        body.append(f"    return r * 2 - {args[-1]};")
+        lines.append(f"fn h{h}({', '.join(a + ': i32' for a in args)}) -> i32 {{\n" + "\n".join(body) + "\n}")
+        helpers.append((f"h{h}", arity))
+
+    names = [f"v{i}" for i in range(var_num)]
+    counter = [0]
+
+    def expr():
+        kind = rng.random()
+        if kind < 0.15 and helpers:
+            callee, arity = rng.choice(helpers)
+            return f"{callee}({', '.join(rng.choice(names) for _ in range(arity))})"
+        terms = [rng.choice(names) if rng.random() < 0.8 else str(rng.randint(0, 9)) for _ in range(rng.randint(1, 3))]
+        return f" {rng.choice('+-')} ".join(terms)
+
+    def block(depth, indent):
+        stmts = []
+        for _ in range(rng.randint(2, 5)):
+            kind = rng.random()
+            pad = "    " * indent
+            if kind < 0.5 or depth >= 2:
+                stmts.append(f"{pad}{rng.choice(names)} = {expr()};")
+            elif kind < 0.7:
+                loop_var = f"i{counter[0]}"
+                counter[0] += 1
+                stmts.append(f"{pad}let mut {loop_var} = 0;")
+                stmts.append(f"{pad}while {loop_var} < {rng.randint(1, 3)} {{")
+                stmts.extend(block(depth + 1, indent + 1))
+                stmts.append(f"{pad}    {loop_var} = {loop_var} + 1;")
+                stmts.append(f"{pad}}}")
+            elif kind < 0.9:
+                stmts.append(f"{pad}if {rng.choice(names)} {rng.choice(['<', '>=', '==', '!='])} {rng.choice(names)} {{")
+                stmts.extend(block(depth + 1, indent + 1))
+                stmts.append(f"{pad}}} else {{")
+                stmts.extend(block(depth + 1, indent + 1))
+                stmts.append(f"{pad}}}")
+            else:
+                stmts.append(f"{pad}let z{counter[0]} = sink({rng.choice(names)});")
+                counter[0] += 1
+        return stmts
+
+    main = [f"    let mut {name} = {rng.randint(-5, 5)};" for name in names]
+    main += block(0, 1)
+    main += [f"    let z{counter[0] + i} = sink({name});" for i, name in enumerate(names)]
+    lines.append("fn main() {\n" + "\n".join(main) + "\n}")
+    return "\n".join(lines)
+
+
+class CodegenDifferentialTest(unittest.TestCase):
+    """中间代码解释执行与目标代码模拟执行结果一致"""
+
+    @classmethod
+    def setUpClass(cls):
+        logging.getLogger('compiler_logger').setLevel(logging.CRITICAL)
+        for handler in logging.getLogger('compiler_logger').handlers:
+            handler.setLevel(logging.CRITICAL)
+        cls.parser = Parser()
+        cls.parser.build_table(RUST_GRAMMAR_PPT)
+
+    def check(self, source: str, expected=None):
+        checker = SemanticChecker()
+        self.parser.parse(code=source.strip(), checker=checker)
+        self.assertEqual(checker.get_errors(), [], source)
+        quads = checker.get_quads()
+        ir_out = run_quads(quads, checker.symbolTable)
+        if expected is not None:
+            self.assertEqual(ir_out, expected, source)
+        for emit_comments in (True, False):
+            generator = AimCodeGenerator([(i, q) for i, q in enumerate(quads)][1:], checker.symbolTable,
+                                         emit_comments=emit_comments)
+            generator.generate_code()
+            self.assertEqual(run_mips(generator.code), ir_out, f"{source}\n\n" + "\n".join(generator.code))
+
+    def test_temporary_live_across_call(self):
+        locals_ = "\n".join(f"    let v{i} = v{i - 1} + {i};" for i in range(1, 22))
+        self.check(SINK + f"""
+fn out(a: i32) -> i32 {{ return a * 100 + 5; }}
+fn g(n: i32) -> i32 {{
+    let v0 = n;
+{locals_}
+    return v21 - 200;
+}}
+fn main() {{ let r = out(5) + g(3); let z = sink(r); }}
+""", [539])
+
+    def test_parameter_live_across_branch_with_call(self):
+        self.check(SINK + """
+fn g(x: i32) -> i32 { return x * 2; }
+fn f(n: i32, c: i32) -> i32 {
+    let mut s = 0;
+    if c > 0 { s = g(5); } else { s = 7; }
+    return s + n;
+}
+fn main() { let a = f(20, 0); let b = f(20, 1); let z = sink(a); let y = sink(b); }
+""", [27, 30])
+
+    def test_parameter_live_across_loop_with_call(self):
+        self.check(SINK + """
+fn g(a: i32, b: i32) -> i32 { return a + b; }
+fn f(n: i32, m: i32) -> i32 {
+    let mut s = 1;
+    let mut i = 0;
+    while i < n { s = g(s, m) * 2; i = i + 1; }
+    return s;
+}
+fn main() { let r = f(4, 3); let z = sink(r); }
+""", [106])
+
+    def test_arguments_swapped_between_parameter_registers(self):
+        self.check(SINK + """
+fn sub2(a: i32, b: i32) -> i32 { let q = a - b; return q; }
+fn h(n: i32, m: i32) -> i32 { let t = sub2(m, n); let u = sub2(n, m); return t * 100 + u + n; }
+fn main() { let r = h(7, 3); let z = sink(r); }
+""", [-389])
+
+    def test_spills_inside_loop(self):
+        names = [f"v{i}" for i in range(20)]
+        decls = "\n".join(f"    let mut {name} = {i};" for i, name in enumerate(names))
+        body = "\n".join(f"        {names[i]} = {names[i]} + {names[(i + 1) % 20]};" for i in range(20))
+        sinks = "\n".join(f"    let z{i} = sink({name});" for i, name in enumerate(names))
+        self.check(SINK + f"fn main() {{\n{decls}\n    let mut k = 0;\n    while k < 3 {{\n{body}\n        k = k + 1;\n    }}\n{sinks}\n}}\n")
+
+    def test_random_programs(self):
+        rng = random.Random(20261015)
+        for _ in range(40):
+            with self.subTest():
+                self.check(random_program(rng, rng.choice([3, 8, 20])))
+
+
+if __name__ == '__main__':
+    unittest.main()